@@ -1,12 +1,21 @@
 from mcp.server.fastmcp import FastMCP, Context
 from loguru import logger
-from typing import List, Dict, Optional
+from typing import List, Dict, Tuple
 import asyncio
 import time
 from pathlib import Path
-import json
+from types import MappingProxyType
+import operator
+import orjson
+import os
+import sys
 from functools import lru_cache
 
+# Configure logging once at startup. Log calls below pass their arguments to
+# loguru instead of f-strings, so messages below LOG_LEVEL are never formatted.
+logger.remove()
+logger.add(sys.stderr, level=os.getenv("LOG_LEVEL", "INFO"))
+
 # Create an MCP server
 mcp = FastMCP("Demo")
 
@@ -14,61 +23,81 @@ mcp = FastMCP("Demo")
 @mcp.tool()
 def add(a: int, b: int) -> int:
     """Add two numbers"""
-    logger.info(f"Adding {a} and {b}")
+    logger.info("Adding {} and {}", a, b)
     return a + b
 
+# Resources below are pure functions of their arguments, so responses are
+# memoized with lru_cache (as generate_stats already is) and only built once.
+# FastMCP validates template resources with pydantic, which only accepts plain
+# functions, so the cache sits on a helper the resource calls.
+
+@lru_cache(maxsize=256)
+def _greeting(name: str) -> str:
+    """Build a personalized greeting."""
+    return f"Hello, {name}!"
+
 # Add a dynamic greeting resource
 @mcp.resource("greeting://{name}")
 def get_greeting(name: str) -> str:
     """Get a personalized greeting"""
-    logger.info(f"Generating greeting for {name}")
-    return f"Hello, {name}!"
+    logger.info("Generating greeting for {}", name)
+    return _greeting(name)
+
+# Add new static resource, serialized once at import
+_CONFIG_JSON = orjson.dumps({
+    "app_name": "Demo MCP Server",
+    "version": "1.0.0",
+    "description": "A simple MCP server for learning purposes"
+}).decode()
 
-# Add new static resource
 @mcp.resource("config://app")
 def get_config() -> str:
     """Static configuration data"""
     logger.info("Fetching app configuration")
-    return """
-    {
-        "app_name": "Demo MCP Server",
-        "version": "1.0.0",
-        "description": "A simple MCP server for learning purposes"
-    }
-    """
+    return _CONFIG_JSON
 
 # Add new dynamic resource with multiple parameters
+CALCULATOR_OPERATIONS = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": operator.truediv
+}
+
 @mcp.resource("calculator://{operation}/{a}/{b}")
 def calculator_resource(operation: str, a: float, b: float) -> str:
     """Dynamic calculator resource"""
-    logger.info(f"Calculating {operation} for {a} and {b}")
-    operations = {
-        "add": lambda: a + b,
-        "subtract": lambda: a - b,
-        "multiply": lambda: a * b,
-        "divide": lambda: a / b if b != 0 else "Error: Division by zero"
-    }
-    
-    if operation not in operations:
+    logger.info("Calculating {} for {} and {}", operation, a, b)
+    return _calculate(operation, a, b)
+
+@lru_cache(maxsize=512)
+def _calculate(operation: str, a: float, b: float) -> str:
+    """Compute a calculator resource response."""
+    operation_fn = CALCULATOR_OPERATIONS.get(operation)
+    if operation_fn is None:
         return f"Error: Unknown operation '{operation}'"
     
-    result = operations[operation]()
+    if operation == "divide" and b == 0:
+        result = "Error: Division by zero"
+    else:
+        result = operation_fn(a, b)
     return f"Result of {operation}({a}, {b}) = {result}"
 
+# The sample user is the same for every ID, so it is serialized once at import
+_USER_JSON = orjson.dumps({
+    "user_id": "123",
+    "name": "John Doe",
+    "email": "john.doe@example.com"
+}).decode()
+
 @mcp.resource("user://{user_id}")
 def get_user_info(user_id: str) -> str:
     """Get user information by ID"""
-    logger.info(f"Fetching user info for {user_id}")
-    return """
-    {
-        "user_id": "123",
-        "name": "John Doe",
-        "email": "john.doe@example.com"
-    }
-    """
+    logger.info("Fetching user info for {}", user_id)
+    return _USER_JSON
 
-# Sample product data for demonstration
-products = {
+# Sample product data for demonstration (read-only)
+products = MappingProxyType({
     "123": {
         "product_id": "123",
         "name": "Product A",
@@ -81,58 +110,52 @@ products = {
         "price": 29.99,
         "description": "Another product description"
     }
-}
+})
+
+# The catalog is static, so every response is serialized once at import
+_PRODUCT_JSON = MappingProxyType({
+    product_id: orjson.dumps(product).decode()
+    for product_id, product in products.items()
+})
+_PRODUCT_NOT_FOUND_JSON = orjson.dumps({"error": "Product not found."}).decode()
 
 @mcp.resource("product://{product_id}")
 def get_product_info(product_id: str) -> str:
     """Get product information by ID"""
-    logger.info(f"Fetching product info for {product_id}")
-    
-    # Check if the product_id exists in the products dictionary
-    if product_id in products:
-        product = products[product_id]
-        return f"""
-        {{
-            "product_id": "{product['product_id']}",
-            "name": "{product['name']}",
-            "price": {product['price']},
-            "description": "{product['description']}"
-        }}
-        """
-    else:
-        return f"""
-        {{
-            "error": "Product not found."
-        }}
-        """
+    logger.info("Fetching product info for {}", product_id)
+    return _PRODUCT_JSON.get(product_id, _PRODUCT_NOT_FOUND_JSON)
 
 # 1. Tool with multiple parameters and type validation
 @mcp.tool()
 def analyze_text(
     text: str,
-    options: Dict[str, bool] = {"count_words": True, "count_chars": True},
-    exclude_words: Optional[List[str]] = None
+    count_words: bool = True,
+    count_chars: bool = True,
+    exclude_words: Tuple[str, ...] = ()
 ) -> Dict[str, any]:
     """
     Analyze text with configurable options
     
     Args:
         text: Text to analyze
-        options: Dictionary of analysis options
-        exclude_words: List of words to exclude from counting
+        count_words: Whether to include a word count
+        count_chars: Whether to include a character count
+        exclude_words: Words to exclude from counting
     """
-    logger.info(f"Analyzing text with options: {options}")
+    logger.info("Analyzing text (count_words={}, count_chars={})", count_words, count_chars)
     
     result = {}
-    words = text.split()
     
-    if exclude_words:
-        words = [w for w in words if w.lower() not in exclude_words]
+    if count_words:
+        if exclude_words:
+            # Lowercase the exclusions once so each word is a single hash lookup,
+            # and lowercase the text in one C-level pass rather than word by word
+            excluded = frozenset(word.lower() for word in exclude_words)
+            result["word_count"] = sum(1 for w in text.lower().split() if w not in excluded)
+        else:
+            result["word_count"] = len(text.split())
     
-    if options.get("count_words"):
-        result["word_count"] = len(words)
-    
-    if options.get("count_chars"):
+    if count_chars:
         result["char_count"] = len(text)
         
     return result
@@ -145,31 +168,39 @@ async def process_items(items: List[str], delay: float = 0.5, ctx: Context = Non
     
     Args:
         items: List of items to process
-        delay: Delay between items (for demo purposes)
+        delay: Simulated processing time per item (for demo purposes)
         ctx: MCP context for progress tracking
     """
-    logger.info(f"Processing {len(items)} items")
-    results = []
+    logger.info("Processing {} items", len(items))
+    total_start = time.time()
+    semaphore = asyncio.Semaphore(16)  # Bound how many items run at once
+    completed = 0
     
-    for i, item in enumerate(items):
-        start_time = time.time()
-        
-        # Simulate processing
-        await asyncio.sleep(delay)
-        results.append(f"Processed {item}")
-        
-        # Track progress
-        if ctx:
-            await ctx.report_progress(i + 1, len(items))
-            ctx.info(f"Processed item {i + 1}/{len(items)}")
+    async def process_one(item: str) -> str:
+        nonlocal completed
+        async with semaphore:
+            start_time = time.time()
+            
+            # Simulate processing
+            await asyncio.sleep(delay)
+            completed += 1
             
-        processing_time = time.time() - start_time
-        logger.info(f"Item {item} processed in {processing_time:.2f}s")
+            # Track progress
+            if ctx:
+                await ctx.report_progress(completed, len(items))
+                await ctx.info(f"Processed item {completed}/{len(items)}")
+                
+            processing_time = time.time() - start_time
+            logger.info("Item {} processed in {:.2f}s", item, processing_time)
+            return f"Processed {item}"
+    
+    # Items are independent, so process them concurrently; gather keeps input order
+    results = await asyncio.gather(*(process_one(item) for item in items))
     
     return {
         "processed_count": len(results),
         "results": results,
-        "total_time": time.time() - start_time
+        "total_time": time.time() - total_start
     }
 
 # 3. Document Analysis System
@@ -198,80 +229,108 @@ async def analyze_document(file_id: str, analysis_options: Dict):
 @mcp.resource("api/v1/{category}/{id}")
 def get_api_resource(category: str, id: str) -> str:
     """Dynamic routing with versioning"""
-    logger.info(f"Accessing {category} resource with ID {id}")
+    logger.info("Accessing {} resource with ID {}", category, id)
     
-    categories = {
-        "users": lambda: handle_users(id),
-        "products": lambda: handle_products(id),
-        "orders": lambda: handle_orders(id)
-    }
-    
-    if category not in categories:
-        return json.dumps({"error": f"Category '{category}' not found"})
+    handler = API_HANDLERS.get(category)
+    if handler is None:
+        return orjson.dumps({"error": f"Category '{category}' not found"}).decode()
     
-    return json.dumps(categories[category]())
+    return orjson.dumps(handler(id)).decode()
 
 # 2. Nested Resource Paths
 @mcp.resource("data/{year}/{month}/{day}/stats")
 def get_daily_stats(year: str, month: str, day: str) -> str:
     """Nested path structure for date-based data"""
-    logger.info(f"Fetching stats for {year}-{month}-{day}")
+    logger.info("Fetching stats for {}-{}-{}", year, month, day)
     
     try:
         # Validate date components
         date_path = Path(f"data/{year}/{month}/{day}")
         if not date_path.exists():
-            return json.dumps({"error": "No data for specified date"})
+            return orjson.dumps({"error": "No data for specified date"}).decode()
             
-        return json.dumps({
+        return orjson.dumps({
             "date": f"{year}-{month}-{day}",
             "stats": generate_stats(year, month, day)
-        })
+        }).decode()
     except Exception as e:
-        logger.error(f"Error fetching stats: {e}")
-        return json.dumps({"error": str(e)})
+        logger.error("Error fetching stats: {}", e)
+        return orjson.dumps({"error": str(e)}).decode()
 
 # 3. Resource Caching
-@lru_cache(maxsize=100)
+# Stats expire after STATS_TTL_SECONDS so a day that is still collecting data
+# is regenerated, and the cache is bounded as new dates keep arriving.
+STATS_TTL_SECONDS = 300
+STATS_CACHE_MAXSIZE = 1024
+_stats_cache: Dict[Tuple[str, str, str], Tuple[float, Dict]] = {}
+
+# Set SIMULATE_SLOW_STATS=1 to add a 1s delay that shows the cache working
+SIMULATE_SLOW_STATS = os.getenv("SIMULATE_SLOW_STATS") == "1"
+
 def generate_stats(year: str, month: str, day: str) -> Dict:
     """Cached function for generating statistics"""
-    logger.info(f"Generating stats for {year}-{month}-{day}")
-    # Simulate expensive computation
-    import time
-    time.sleep(1)
-    return {
+    key = (year, month, day)
+    now = time.monotonic()
+    cached = _stats_cache.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    
+    logger.info("Generating stats for {}-{}-{}", year, month, day)
+    if SIMULATE_SLOW_STATS:
+        # Simulate expensive computation
+        time.sleep(1)
+    stats = {
         "visits": 1000,
         "unique_users": 500,
         "peak_time": "14:00"
     }
+    
+    if len(_stats_cache) >= STATS_CACHE_MAXSIZE:
+        # Drop expired entries first, then the oldest insertion if still full
+        for expired_key in [k for k, (expires, _) in _stats_cache.items() if expires <= now]:
+            del _stats_cache[expired_key]
+        if len(_stats_cache) >= STATS_CACHE_MAXSIZE:
+            del _stats_cache[next(iter(_stats_cache))]
+    _stats_cache[key] = (now + STATS_TTL_SECONDS, stats)
+    return stats
+
+# Sample data for the routed API resources, built once instead of per call
+API_USERS = MappingProxyType({
+    "1": {"name": "John Doe", "email": "john@example.com"},
+    "2": {"name": "Jane Smith", "email": "jane@example.com"}
+})
+
+API_PRODUCTS = MappingProxyType({
+    "1": {"name": "Widget", "price": 19.99},
+    "2": {"name": "Gadget", "price": 29.99}
+})
+
+API_ORDERS = MappingProxyType({
+    "1": {"user_id": "1", "product_id": "2", "status": "shipped"},
+    "2": {"user_id": "2", "product_id": "1", "status": "pending"}
+})
 
 # Handler functions for different categories
 def handle_users(id: str) -> Dict:
-    users = {
-        "1": {"name": "John Doe", "email": "john@example.com"},
-        "2": {"name": "Jane Smith", "email": "jane@example.com"}
-    }
-    return users.get(id, {"error": "User not found"})
+    return API_USERS.get(id, {"error": "User not found"})
 
 def handle_products(id: str) -> Dict:
-    products = {
-        "1": {"name": "Widget", "price": 19.99},
-        "2": {"name": "Gadget", "price": 29.99}
-    }
-    return products.get(id, {"error": "Product not found"})
+    return API_PRODUCTS.get(id, {"error": "Product not found"})
 
 def handle_orders(id: str) -> Dict:
-    orders = {
-        "1": {"user_id": "1", "product_id": "2", "status": "shipped"},
-        "2": {"user_id": "2", "product_id": "1", "status": "pending"}
-    }
-    return orders.get(id, {"error": "Order not found"})
+    return API_ORDERS.get(id, {"error": "Order not found"})
+
+API_HANDLERS = {
+    "users": handle_users,
+    "products": handle_products,
+    "orders": handle_orders
+}
 
 # 4. Resource Update Notifications
 @mcp.tool()
 async def update_resource(category: str, id: str, data: Dict, ctx: Context = None) -> Dict:
     """Update a resource and notify about changes"""
-    logger.info(f"Updating {category} resource {id}")
+    logger.info("Updating {} resource {}", category, id)
     
     try:
         # Simulate update
@@ -285,5 +344,5 @@ async def update_resource(category: str, id: str, data: Dict, ctx: Context = Non
             "data": data
         }
     except Exception as e:
-        logger.error(f"Update failed: {e}")
+        logger.error("Update failed: {}", e)
         return {"status": "error", "message": str(e)}
@@ -10,7 +10,14 @@ class SQLExplorerClient:
         self.exit_stack = AsyncExitStack()
 
     async def connect(self):
-        """Connect to the MCP server using mcp connect"""
+        """Connect to the MCP server using mcp connect
+
+        The session is reused for every test, so calling this again on a
+        connected client is a no-op rather than spawning a second server.
+        """
+        if self.session is not None:
+            return
+        
         import subprocess
         
         process = subprocess.Popen(
@@ -19,6 +26,8 @@ class SQLExplorerClient:
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE
         )
+        # Terminate the server process exactly once, when cleanup() closes the stack
+        self.exit_stack.callback(process.terminate)
         
         self.session = await ClientSession.connect_stdio(process.stdout, process.stdin)
         await self.session.initialize()
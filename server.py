@@ -1,16 +1,194 @@
 from mcp.server.fastmcp import FastMCP, Context
 from loguru import logger
-import sqlite3
+from collections import OrderedDict
+from itertools import islice
+from typing import Optional
+import apsw
+import asyncio
+import io
+import threading
 
 mcp = FastMCP("SQLite Explorer")
 
+DB_PATH = "online_retail.db"
+
+# Single connection shared by every resource and tool call. apsw is a thin
+# binding over the SQLite C API with less per-call overhead than sqlite3.
+# Async tools run their queries in worker threads via asyncio.to_thread, and
+# the connection is opened without SQLite's own mutex, so every access must
+# hold _DB_LOCK.
+_CONN = apsw.Connection(
+    DB_PATH,
+    flags=apsw.SQLITE_OPEN_READWRITE | apsw.SQLITE_OPEN_CREATE | apsw.SQLITE_OPEN_NOMUTEX
+)
+_CONN.setbusytimeout(5000)
+_CONN.execute("PRAGMA journal_mode=WAL")
+_CONN.execute("PRAGMA synchronous=NORMAL")
+# 64MB page cache, 256MB memory-mapped I/O and in-memory temp tables keep the
+# GROUP BY scans in analyze_sales off the disk once the cache is warm.
+_CONN.execute("PRAGMA cache_size=-65536")
+_CONN.execute("PRAGMA mmap_size=268435456")
+_CONN.execute("PRAGMA temp_store=MEMORY")
+
+def _ensure_indexes(conn: apsw.Connection) -> None:
+    """Create the covering index used by the analyze_sales aggregations"""
+    # Country leads so the WHERE Country = ? lookup is an index seek and the
+    # GROUP BY walks rows already in order; the remaining columns let both
+    # queries read the (much narrower) index instead of the table.
+    try:
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_online_retail_country_sales "
+            "ON online_retail(Country, InvoiceNo, Quantity, UnitPrice)"
+        )
+    except apsw.SQLError as e:
+        logger.warning(f"Could not create sales index: {e}")
+
+_ensure_indexes(_CONN)
+# Every tool exposed here only reads from the database.
+_CONN.execute("PRAGMA query_only=1")
+_DB_LOCK = threading.Lock()
+
+# Formatted query results keyed by the request that produced them. Results
+# larger than _CACHE_MAX_RESULT_SIZE are never stored so one huge SELECT
+# cannot push every hot aggregation out of the cache. Entries belong to the
+# database version in _CACHE_VERSION; the whole cache is dropped as soon as
+# the database is seen to have changed.
+_CACHE_MAXSIZE = 256
+_CACHE_MAX_RESULT_SIZE = 1_000_000
+_RESULT_CACHE: "OrderedDict[tuple, str]" = OrderedDict()
+_CACHE_VERSION: Optional[tuple] = None
+_CACHE_LOCK = threading.Lock()
+
+# query_data reads rows in batches and caps how many it will format.
+_QUERY_FETCH_SIZE = 1000
+_QUERY_MAX_ROWS = 10_000
+
+# analyze_sales always sends the same SQL text over the shared connection, so
+# the connection's statement cache keeps both compiled statements hot.
+_SQL_SALES_BY_COUNTRY = """
+SELECT Country, COUNT(DISTINCT InvoiceNo) as OrderCount, 
+       SUM(CAST(Quantity AS REAL) * CAST(UnitPrice AS REAL)) as Revenue
+FROM online_retail 
+WHERE Country = ?
+GROUP BY Country
+"""
+
+_SQL_SALES_TOP_COUNTRIES = """
+SELECT Country, COUNT(DISTINCT InvoiceNo) as OrderCount, 
+       SUM(CAST(Quantity AS REAL) * CAST(UnitPrice AS REAL)) as Revenue
+FROM online_retail 
+GROUP BY Country
+ORDER BY Revenue DESC LIMIT 10
+"""
+
+def _db_version() -> tuple:
+    """Return a token that changes whenever the database contents change
+
+    PRAGMA data_version moves when another connection commits to the file
+    (e.g. the loader refreshing online_retail); totalchanges() covers writes
+    made over _CONN itself. The caller must hold _DB_LOCK.
+    """
+    data_version = _CONN.execute("PRAGMA data_version").fetchall()[0][0]
+    return (data_version, _CONN.totalchanges())
+
+def _cache_get(key: tuple, version: tuple) -> Optional[str]:
+    """Return a cached result and mark it as recently used
+
+    The cache is cleared first if the database changed since its entries
+    were stored.
+    """
+    global _CACHE_VERSION
+    with _CACHE_LOCK:
+        if version != _CACHE_VERSION:
+            _RESULT_CACHE.clear()
+            _CACHE_VERSION = version
+            return None
+        result = _RESULT_CACHE.get(key)
+        if result is not None:
+            _RESULT_CACHE.move_to_end(key)
+        return result
+
+def _cache_put(key: tuple, result: str, version: tuple) -> None:
+    """Store a result, evicting the least recently used entry when full
+
+    Results read from an older database version than the cache's are dropped.
+    """
+    if len(result) > _CACHE_MAX_RESULT_SIZE:
+        return
+    with _CACHE_LOCK:
+        if version != _CACHE_VERSION:
+            return
+        _RESULT_CACHE[key] = result
+        _RESULT_CACHE.move_to_end(key)
+        if len(_RESULT_CACHE) > _CACHE_MAXSIZE:
+            _RESULT_CACHE.popitem(last=False)
+
+def _query_sync(sql: str) -> str:
+    """Run an arbitrary query and format its rows, one per line
+
+    Rows are streamed from the cursor in batches and output stops after
+    _QUERY_MAX_ROWS rows, so an unbounded SELECT cannot exhaust memory.
+    """
+    key = ("query_data", sql)
+    buf = io.StringIO()
+    row_count = 0
+    with _DB_LOCK:
+        version = _db_version()
+        cached = _cache_get(key, version)
+        if cached is not None:
+            return cached
+        cursor = _CONN.execute(sql)
+        while row_count < _QUERY_MAX_ROWS:
+            batch = list(islice(cursor, min(_QUERY_FETCH_SIZE, _QUERY_MAX_ROWS - row_count)))
+            if not batch:
+                break
+            if row_count:
+                buf.write("\n")
+            buf.write("\n".join(map(str, batch)))
+            row_count += len(batch)
+        truncated = row_count == _QUERY_MAX_ROWS and cursor.fetchone() is not None
+        cursor.close()
+    if truncated:
+        buf.write(f"\n... truncated after {_QUERY_MAX_ROWS} rows, add a LIMIT clause to narrow the query")
+    formatted = buf.getvalue()
+    _cache_put(key, formatted, version)
+    return formatted
+
+def _analyze_sales_sync(country: Optional[str]) -> str:
+    """Aggregate orders and revenue for one country or the top 10 countries"""
+    key = ("analyze_sales", country)
+    with _DB_LOCK:
+        version = _db_version()
+        cached = _cache_get(key, version)
+        if cached is not None:
+            return cached
+        if country:
+            result = _CONN.execute(_SQL_SALES_BY_COUNTRY, (country,)).fetchall()
+        else:
+            result = _CONN.execute(_SQL_SALES_TOP_COUNTRIES).fetchall()
+    # Append the pieces of every line to one list and join once at the end
+    parts = []
+    append = parts.append
+    for country_name, order_count, revenue in result:
+        append(str(country_name))
+        append(": ")
+        append(str(order_count))
+        append(" orders, $")
+        append(format(revenue, ".2f"))
+        append(" revenue\n")
+    if parts:
+        parts[-1] = " revenue"  # No newline after the last line
+    formatted = "".join(parts)
+    _cache_put(key, formatted, version)
+    return formatted
+
 @mcp.resource("schema://main")
 def get_schema() -> str:
     """Provide the database schema as a resource"""
-    conn = sqlite3.connect("online_retail.db")
-    schema = conn.execute(
-        "SELECT sql FROM sqlite_master WHERE type='table'"
-    ).fetchall()
+    with _DB_LOCK:
+        schema = _CONN.execute(
+            "SELECT sql FROM sqlite_master WHERE type='table'"
+        ).fetchall()
     return "\n".join(sql[0] for sql in schema if sql[0])
 
 @mcp.tool()
@@ -20,14 +198,13 @@ async def query_data(sql: str, ctx: Context = None) -> str:
     if ctx:
         await ctx.info(f"Executing query: {sql}")
     
-    conn = sqlite3.connect("online_retail.db")
     try:
-        result = conn.execute(sql).fetchall()
+        result = await asyncio.to_thread(_query_sync, sql)
         
         if ctx:
             await ctx.info("Query completed successfully")
             
-        return "\n".join(str(row) for row in result)
+        return result
     except Exception as e:
         if ctx:
             await ctx.error(f"Query failed: {str(e)}")
@@ -40,36 +217,25 @@ async def analyze_sales(country: str = None, ctx: Context = None) -> str:
         await ctx.info("Starting analysis...")
         await ctx.report_progress(1, 2)  # Simple 2-step progress
     
-    conn = sqlite3.connect("online_retail.db")
     try:
-        if country:
-            query = """
-            SELECT Country, COUNT(DISTINCT InvoiceNo) as OrderCount, 
-                   SUM(CAST(Quantity AS REAL) * CAST(UnitPrice AS REAL)) as Revenue
-            FROM online_retail 
-            WHERE Country = ?
-            GROUP BY Country
-            """
-            result = conn.execute(query, (country,)).fetchall()
-        else:
-            query = """
-            SELECT Country, COUNT(DISTINCT InvoiceNo) as OrderCount, 
-                   SUM(CAST(Quantity AS REAL) * CAST(UnitPrice AS REAL)) as Revenue
-            FROM online_retail 
-            GROUP BY Country
-            ORDER BY Revenue DESC LIMIT 10
-            """
-            result = conn.execute(query).fetchall()
+        result = await asyncio.to_thread(_analyze_sales_sync, country)
             
         if ctx:
             await ctx.info("Analysis complete")
             await ctx.report_progress(2, 2)
             
-        return "\n".join(f"{row[0]}: {row[1]} orders, ${row[2]:.2f} revenue" for row in result)
+        return result
     except Exception as e:
         if ctx:
             await ctx.error(f"Analysis failed: {str(e)}")
         return f"Error: {str(e)}"
 
+@mcp.tool()
+def invalidate_cache() -> str:
+    """Clear cached query and analysis results"""
+    with _CACHE_LOCK:
+        _RESULT_CACHE.clear()
+    return "Query cache cleared"
+
 if __name__ == "__main__":
     mcp.run()
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+import re
 import sys
 import sqlite3
 import logging
@@ -18,6 +19,13 @@ if sys.platform == "win32" and os.environ.get('PYTHONIOENCODING') is None:
     sys.stderr.reconfigure(encoding="utf-8")
 
 logger = logging.getLogger('mcp_sqlite_server')
+
+# Number of compiled statements kept on the server's database connection
+STATEMENT_CACHE_SIZE = 256
+
+# Transaction control at the start of a statement; scripts containing it
+# manage their own transaction and are not wrapped in another one
+TRANSACTION_CONTROL_RE = re.compile(r'(?:^|;)\s*(?:BEGIN|COMMIT|END|ROLLBACK)\b', re.IGNORECASE)
 logger.info("Starting MCP SQLite Server")
 
 PROMPT_TEMPLATE = """
@@ -111,9 +119,11 @@ class SqliteDatabase:
     def _init_database(self):
         """Initialize connection to the SQLite database"""
         logger.debug("Initializing database connection")
-        with closing(sqlite3.connect(self.db_path)) as conn:
-            conn.row_factory = sqlite3.Row
-            conn.close()
+        # Keep one connection for the server's lifetime: sqlite3 caches compiled
+        # statements per connection keyed by SQL text, so repeated queries skip
+        # the parser instead of being re-prepared on a fresh connection each time
+        self.conn = sqlite3.connect(self.db_path, cached_statements=STATEMENT_CACHE_SIZE)
+        self.conn.row_factory = sqlite3.Row
 
     def _synthesize_memo(self) -> str:
         """Synthesizes business insights into a formatted memo"""
@@ -137,26 +147,73 @@ class SqliteDatabase:
     def _execute_query(self, query: str, params: dict[str, Any] | None = None) -> list[dict[str, Any]]:
         """Execute a SQL query and return results as a list of dictionaries"""
         logger.debug(f"Executing query: {query}")
+        conn = self.conn
         try:
-            with closing(sqlite3.connect(self.db_path)) as conn:
-                conn.row_factory = sqlite3.Row
-                with closing(conn.cursor()) as cursor:
-                    if params:
-                        cursor.execute(query, params)
-                    else:
-                        cursor.execute(query)
-
-                    if query.strip().upper().startswith(('INSERT', 'UPDATE', 'DELETE', 'CREATE', 'DROP', 'ALTER')):
-                        conn.commit()
-                        affected = cursor.rowcount
-                        logger.debug(f"Write query affected {affected} rows")
-                        return [{"affected_rows": affected}]
-
-                    results = [dict(row) for row in cursor.fetchall()]
-                    logger.debug(f"Read query returned {len(results)} rows")
-                    return results
+            with closing(conn.cursor()) as cursor:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+
+                # Statements without a result set are writes; fetch any rows
+                # (e.g. from RETURNING) before committing
+                results = None if cursor.description is None else [dict(row) for row in cursor.fetchall()]
+
+                # The connection is shared, so commit whatever transaction the
+                # statement opened (REPLACE, WITH ... INSERT, ...) rather than
+                # matching statement prefixes; otherwise it holds the write lock
+                if conn.in_transaction:
+                    conn.commit()
+
+                if results is None:
+                    affected = cursor.rowcount
+                    logger.debug(f"Write query affected {affected} rows")
+                    return [{"affected_rows": affected}]
+
+                logger.debug(f"Read query returned {len(results)} rows")
+                return results
         except Exception as e:
             logger.error(f"Database error executing query: {e}")
+            # The connection is shared, so don't leave a failed write's transaction open
+            conn.rollback()
+            raise
+
+    def _execute_script(self, script: str) -> list[dict[str, Any]]:
+        """Execute a multi-statement SQL script inside a single transaction
+
+        Scripts with their own BEGIN/COMMIT are run as written, since SQLite
+        cannot nest a second transaction inside the one added here.
+        """
+        logger.debug(f"Executing script: {script}")
+        conn = self.conn
+        try:
+            changes_before = conn.total_changes
+            if TRANSACTION_CONTROL_RE.search(script):
+                conn.executescript(script)
+            else:
+                conn.executescript(f"BEGIN;\n{script}\n;COMMIT;")
+            affected = conn.total_changes - changes_before
+            logger.debug(f"Write script affected {affected} rows")
+            return [{"affected_rows": affected}]
+        except Exception as e:
+            logger.error(f"Database error executing script: {e}")
+            # A failing statement leaves the script's transaction open; roll it
+            # back so the script applies atomically
+            conn.rollback()
+            raise
+
+    def _execute_many(self, query: str, rows: list[list[Any]]) -> list[dict[str, Any]]:
+        """Execute one parameterized write statement for every row in a single transaction"""
+        logger.debug(f"Executing query for {len(rows)} rows: {query}")
+        conn = self.conn
+        try:
+            with conn:
+                cursor = conn.executemany(query, rows)
+                affected = cursor.rowcount
+            logger.debug(f"Batched write affected {affected} rows")
+            return [{"affected_rows": affected}]
+        except Exception as e:
+            logger.error(f"Database error executing batched query: {e}")
             raise
 
 async def main(db_path: str):
@@ -262,6 +319,33 @@ async def main(db_path: str):
                     "required": ["query"],
                 },
             ),
+            types.Tool(
+                name="write_script",
+                description="Execute several semicolon-separated INSERT, UPDATE, DELETE or DDL statements in one transaction, unless the script issues its own BEGIN/COMMIT",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "script": {"type": "string", "description": "SQL statements to execute, separated by semicolons"},
+                    },
+                    "required": ["script"],
+                },
+            ),
+            types.Tool(
+                name="write_many",
+                description="Execute a parameterized INSERT, UPDATE, or DELETE query once per row of parameters in one transaction",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "query": {"type": "string", "description": "SQL query with ? placeholders"},
+                        "rows": {
+                            "type": "array",
+                            "items": {"type": "array"},
+                            "description": "One list of parameter values per execution",
+                        },
+                    },
+                    "required": ["query", "rows"],
+                },
+            ),
             types.Tool(
                 name="create_table",
                 description="Create a new table in the SQLite database",
@@ -303,6 +387,17 @@ async def main(db_path: str):
                     "required": ["insight"],
                 },
             ),
+            types.Tool(
+                name="append_and_get_memo",
+                description="Add a business insight to the memo and return the updated memo",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "insight": {"type": "string", "description": "Business insight discovered from data analysis"},
+                    },
+                    "required": ["insight"],
+                },
+            ),
         ]
 
     @server.call_tool()
@@ -337,6 +432,19 @@ async def main(db_path: str):
 
                 return [types.TextContent(type="text", text="Insight added to memo")]
 
+            elif name == "append_and_get_memo":
+                if not arguments or "insight" not in arguments:
+                    raise ValueError("Missing insight argument")
+
+                # Append and synthesize without awaiting in between, so the
+                # returned memo always includes this insight
+                db.insights.append(arguments["insight"])
+                memo = db._synthesize_memo()
+
+                await server.request_context.session.send_resource_updated(AnyUrl("memo://insights"))
+
+                return [types.TextContent(type="text", text=memo)]
+
             if not arguments:
                 raise ValueError("Missing arguments")
 
@@ -352,6 +460,18 @@ async def main(db_path: str):
                 results = db._execute_query(arguments["query"])
                 return [types.TextContent(type="text", text=str(results))]
 
+            elif name == "write_script":
+                if not arguments.get("script", "").strip():
+                    raise ValueError("Missing script argument")
+                results = db._execute_script(arguments["script"])
+                return [types.TextContent(type="text", text=str(results))]
+
+            elif name == "write_many":
+                if arguments["query"].strip().upper().startswith("SELECT"):
+                    raise ValueError("SELECT queries are not allowed for write_many")
+                results = db._execute_many(arguments["query"], arguments.get("rows", []))
+                return [types.TextContent(type="text", text=str(results))]
+
             elif name == "create_table":
                 if not arguments["query"].strip().upper().startswith("CREATE TABLE"):
                     raise ValueError("Only CREATE TABLE statements are allowed")
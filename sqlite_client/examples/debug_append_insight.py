@@ -10,39 +10,25 @@ import os
 import sys
 import time
 import traceback
-from pathlib import Path
 
-# Add the parent directory to the path so we can import the package
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from src import SQLiteMCPClient
+from src import get_client, run_with_client
+from src.config import DEFAULT_SERVER_PATH, DEFAULT_DB_PATH
 from loguru import logger
 
-# Configure logger to show more detailed information
-logger.remove()
-logger.add(sys.stderr, level="DEBUG", format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level} | {message}")
-
 
 async def debug_append_insight():
     """Debug the append_insight functionality with detailed logging."""
     print("SQLite MCP Client - Debug Append Insight")
     print("=======================================\n")
     
-    # Get server path from environment or use default
-    server_path = os.getenv("SQLITE_SERVER_PATH", "mcp-server-sqlite")
-    db_path = os.getenv("SQLITE_DB_PATH", "~/test.db")
-    
-    print(f"Connecting to server: {server_path}")
-    print(f"Database path: {db_path}\n")
-    
-    # Initialize client
-    client = SQLiteMCPClient()
+    print(f"Connecting to server: {DEFAULT_SERVER_PATH}")
+    print(f"Database path: {DEFAULT_DB_PATH}\n")
     
     try:
         # Connect to server
         logger.debug("Attempting to connect to server...")
         start_time = time.time()
-        await client.connect_to_server(server_path, db_path)
+        client = await get_client(DEFAULT_SERVER_PATH, DEFAULT_DB_PATH)
         connect_time = time.time() - start_time
         logger.debug(f"Connected to server in {connect_time:.2f} seconds")
         print(f"Connected to server successfully in {connect_time:.2f} seconds\n")
@@ -60,10 +46,8 @@ async def debug_append_insight():
             start_time = time.time()
             
             # Direct call without retry logic
-            result = await asyncio.wait_for(
-                client.session.call_tool("append_insight", {"insight": insight_text}),
-                timeout=10
-            )
+            async with asyncio.timeout(10):
+                result = await client.session.call_tool("append_insight", {"insight": insight_text})
             
             elapsed = time.time() - start_time
             logger.debug(f"Direct tool call completed in {elapsed:.2f} seconds")
@@ -109,14 +93,16 @@ async def debug_append_insight():
             
             elapsed = time.time() - start_time
             logger.debug(f"Non-blocking call returned in {elapsed:.2f} seconds")
-            logger.debug(f"Result: {result}")
+            logger.debug(f"Result: {result['message']}")
             
-            print(f"Result: {result}")
+            print(f"Result: {result['message']}")
             print(f"Returned in {elapsed:.2f} seconds")
             
             print("Waiting for background task to complete...")
-            await asyncio.sleep(5)  # Give the background task time to complete
-            print("Continued after waiting\n")
+            await result["future"]
+            elapsed = time.time() - start_time
+            logger.debug(f"Background task completed after {elapsed:.2f} seconds")
+            print(f"Background task completed after {elapsed:.2f} seconds\n")
         except Exception as e:
             logger.error(f"Error in non-blocking append_insight: {str(e)}")
             logger.error(traceback.format_exc())
@@ -146,18 +132,10 @@ async def debug_append_insight():
         logger.error(f"Error: {str(e)}")
         logger.error(traceback.format_exc())
         print(f"Error: {str(e)}")
-    finally:
-        # Clean up
-        print("\nCleaning up resources...")
-        logger.debug("Cleaning up resources...")
-        start_time = time.time()
-        
-        await client.cleanup()
-        
-        elapsed = time.time() - start_time
-        logger.debug(f"Cleanup completed in {elapsed:.2f} seconds")
-        print(f"Resources cleaned up in {elapsed:.2f} seconds.")
 
 
 if __name__ == "__main__":
-    asyncio.run(debug_append_insight()) 
\ No newline at end of file
+    # Configure logger only when run as a script, not on import
+    logger.remove()
+    logger.add(sys.stderr, level=os.getenv("LOG_LEVEL", "DEBUG"), format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level} | {message}")
+    run_with_client(debug_append_insight) 
\ No newline at end of file
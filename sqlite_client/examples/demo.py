@@ -6,163 +6,199 @@ This script demonstrates how to use the SQLite MCP Client
 to interact with a SQLite database through the MCP server.
 """
 import asyncio
-import os
 import sys
 import json
-from pathlib import Path
 
-# Add the parent directory to the path so we can import the package
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from src import SQLiteMCPClient
+from src import get_client, run_with_client
+from src.client_sqlite import ainput
+from src.config import DEFAULT_SERVER_PATH, DEFAULT_DB_PATH
 from src.query_handler import format_query_results
 from src.insight_gen import analyze_query_results, format_insights_for_memo
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def print_json(data):
+    """Pretty-print data as JSON, using orjson when it is installed."""
+    if orjson is None:
+        print(json.dumps(data, indent=2))
+        return
+    sys.stdout.flush()
+    sys.stdout.buffer.write(orjson.dumps(data, option=orjson.OPT_INDENT_2) + b"\n")
+
+
+# Sample rows inserted by the demo
+SAMPLE_USERS = [
+    ["John Doe", "john@example.com"],
+    ["Jane Smith", "jane@example.com"],
+    ["Bob Johnson", "bob@example.com"],
+    ["Alice Brown", "alice@example.com"],
+    ["Charlie Davis", "charlie@example.com"]
+]
+
+SAMPLE_ORDERS = [
+    [1, 99.99, "completed"],
+    [1, 49.50, "pending"],
+    [2, 149.99, "completed"],
+    [3, 29.99, "completed"],
+    [4, 199.99, "pending"],
+    [2, 59.99, "completed"],
+    [5, 79.99, "cancelled"],
+    [3, 39.99, "completed"],
+    [4, 89.99, "pending"],
+    [5, 129.99, "completed"]
+]
+
+CREATE_USERS_SQL = """
+CREATE TABLE IF NOT EXISTS users (
+  id INTEGER PRIMARY KEY,
+  name TEXT NOT NULL,
+  email TEXT UNIQUE,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+""".strip()
+
+CREATE_ORDERS_SQL = """
+CREATE TABLE IF NOT EXISTS orders (
+  id INTEGER PRIMARY KEY,
+  user_id INTEGER,
+  amount REAL NOT NULL,
+  status TEXT,
+  order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (user_id) REFERENCES users(id)
+)
+""".strip()
+
+SELECT_USERS_SQL = "SELECT * FROM users LIMIT 3"
+
+USER_ORDERS_SQL = """
+SELECT u.name, o.amount, o.status, o.order_date
+FROM users u
+JOIN orders o ON u.id = o.user_id
+ORDER BY o.order_date DESC
+LIMIT 5
+""".strip()
+
+# All per-status statistics are computed by SQLite in one grouped scan
+ORDER_STATS_SQL = """
+SELECT status, COUNT(*) as order_count, SUM(amount) as total_amount,
+       AVG(amount) as avg_amount, MIN(amount) as min_amount, MAX(amount) as max_amount
+FROM orders
+GROUP BY status
+""".strip()
+
+CLEAR_DATA_SQL = "DELETE FROM orders; DELETE FROM users;"
+
+INSERT_USER_SQL = "INSERT INTO users (name, email) VALUES (?, ?)"
+
+INSERT_ORDER_SQL = "INSERT INTO orders (user_id, amount, status) VALUES (?, ?, ?)"
+
+ORDER_STATUSES = sorted({order[2] for order in SAMPLE_ORDERS})
+
+
+def guess_follow_up(response: str):
+    """Guess the likely next question from Claude's last answer.
+
+    Args:
+        response: Claude's previous response
+
+    Returns:
+        A follow-up prompt, or None if nothing obvious stands out
+    """
+    lowered = response.lower()
+    for status in ORDER_STATUSES:
+        if status in lowered:
+            return f"Drill into the orders with status '{status}'"
+    return None
+
 
 async def demo():
     """Run a demonstration of the SQLite MCP Client."""
     print("SQLite MCP Client Demo")
     print("======================\n")
     
-    # Get server path from environment or use default
-    server_path = os.getenv("SQLITE_SERVER_PATH", "mcp-server-sqlite")
-    db_path = os.getenv("SQLITE_DB_PATH", "~/test.db")
-    
-    print(f"Connecting to server: {server_path}")
-    print(f"Database path: {db_path}\n")
-    
-    # Initialize client
-    client = SQLiteMCPClient()
+    print(f"Connecting to server: {DEFAULT_SERVER_PATH}")
+    print(f"Database path: {DEFAULT_DB_PATH}\n")
     
     try:
         # Connect to server
-        await client.connect_to_server(server_path, db_path)
+        client = await get_client(DEFAULT_SERVER_PATH, DEFAULT_DB_PATH)
         
         # Create tables
         print("\n1. Creating tables...")
         
-        # Create users table
-        create_users = """
-        CREATE TABLE IF NOT EXISTS users (
-          id INTEGER PRIMARY KEY,
-          name TEXT NOT NULL,
-          email TEXT UNIQUE,
-          created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """
-        result = await client.create_table(create_users)
-        print(f"Users table created: {result['message']}")
-        
-        # Create orders table
-        create_orders = """
-        CREATE TABLE IF NOT EXISTS orders (
-          id INTEGER PRIMARY KEY,
-          user_id INTEGER,
-          amount REAL NOT NULL,
-          status TEXT,
-          order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-          FOREIGN KEY (user_id) REFERENCES users(id)
+        # The two tables are independent, so create them concurrently
+        users_result, orders_result = await asyncio.gather(
+            client.create_table(CREATE_USERS_SQL),
+            client.create_table(CREATE_ORDERS_SQL)
         )
-        """
-        result = await client.create_table(create_orders)
-        print(f"Orders table created: {result['message']}")
+        print(f"Users table created: {users_result['message']}")
+        print(f"Orders table created: {orders_result['message']}")
         
-        # List tables
+        # List and describe tables concurrently
+        tables, users_schema = await asyncio.gather(
+            client.list_tables(),
+            client.describe_table("users")
+        )
         print("\n2. Listing tables...")
-        tables = await client.list_tables()
         print(f"Tables in database: {tables}")
         
-        # Describe tables
         print("\n3. Describing users table...")
-        users_schema = await client.describe_table("users")
-        print(json.dumps(users_schema, indent=2))
+        print_json(users_schema)
         
         # Insert data
         print("\n4. Inserting sample data...")
         
-        # Clear existing data
-        await client.execute_write_query("DELETE FROM orders")
-        await client.execute_write_query("DELETE FROM users")
-        
-        # Insert users
-        insert_users = """
-        INSERT INTO users (name, email) VALUES 
-          ('John Doe', 'john@example.com'),
-          ('Jane Smith', 'jane@example.com'),
-          ('Bob Johnson', 'bob@example.com'),
-          ('Alice Brown', 'alice@example.com'),
-          ('Charlie Davis', 'charlie@example.com')
-        """
-        users_result = await client.execute_write_query(insert_users)
+        # Clear existing data in one round-trip
+        await client.execute_script(CLEAR_DATA_SQL)
+        
+        # Insert users and orders as parameterized batches
+        users_result = await client.execute_many(INSERT_USER_SQL, SAMPLE_USERS)
         print(f"Inserted users: {users_result}")
         
-        # Insert orders
-        insert_orders = """
-        INSERT INTO orders (user_id, amount, status) VALUES 
-          (1, 99.99, 'completed'),
-          (1, 49.50, 'pending'),
-          (2, 149.99, 'completed'),
-          (3, 29.99, 'completed'),
-          (4, 199.99, 'pending'),
-          (2, 59.99, 'completed'),
-          (5, 79.99, 'cancelled'),
-          (3, 39.99, 'completed'),
-          (4, 89.99, 'pending'),
-          (5, 129.99, 'completed')
-        """
-        orders_result = await client.execute_write_query(insert_orders)
+        orders_result = await client.execute_many(INSERT_ORDER_SQL, SAMPLE_ORDERS)
         print(f"Inserted orders: {orders_result}")
         
         # Query data
         print("\n5. Querying data...")
         
         # Simple SELECT
-        select_users = "SELECT * FROM users LIMIT 3"
-        users_data = await client.execute_read_query(select_users)
+        users_data = await client.execute_read_query(SELECT_USERS_SQL)
         print("\nUsers:")
         print(format_query_results(users_data))
         
         # Join query
-        join_query = """
-        SELECT u.name, o.amount, o.status, o.order_date
-        FROM users u
-        JOIN orders o ON u.id = o.user_id
-        ORDER BY o.order_date DESC
-        LIMIT 5
-        """
-        join_data = await client.execute_read_query(join_query)
+        join_data = await client.execute_read_query(USER_ORDERS_SQL)
         print("\nUser Orders:")
         print(format_query_results(join_data))
         
         # Aggregate query
-        agg_query = """
-        SELECT status, COUNT(*) as order_count, SUM(amount) as total_amount
-        FROM orders
-        GROUP BY status
-        """
-        agg_data = await client.execute_read_query(agg_query)
+        agg_data = await client.execute_read_query(ORDER_STATS_SQL)
         print("\nOrder Statistics by Status:")
         print(format_query_results(agg_data))
         
         # Generate insights
         print("\n6. Generating business insights...")
-        insights = analyze_query_results(agg_query, agg_data)
+        insights = analyze_query_results(ORDER_STATS_SQL, agg_data)
         for insight in insights:
             print(f"- {insight}")
         
         # Add insight to memo
         insight_text = format_insights_for_memo(
             insights, 
-            agg_query, 
+            ORDER_STATS_SQL, 
             "Order Status Analysis"
         )
+        insight_future = None
         try:
             print("\nAttempting to add insight to memo...")
             # Use non-blocking mode to avoid waiting for the operation to complete
             result = await client.append_insight(insight_text, blocking=False)
             print(f"Insight submission: {result['message']}")
-            # Give the background task a moment to start
-            await asyncio.sleep(1)
+            insight_future = result["future"]
             print("Continuing with demo...")
         except Exception as e:
             print(f"Warning: Could not add insight to memo: {str(e)}")
@@ -171,9 +207,13 @@ async def demo():
         # Get insights memo
         print("\n7. Retrieving insights memo...")
         try:
-            # Wait a bit to allow the insight to be processed
-            print("Waiting for insights to be processed...")
-            await asyncio.sleep(3)
+            # Wait for the background insight submission to finish
+            if insight_future is not None:
+                print("Waiting for insights to be processed...")
+                try:
+                    await insight_future
+                except Exception as e:
+                    print(f"Warning: Insight was not added to the memo: {str(e)}")
             
             memo = await client.get_insights_memo()
             print("\nBusiness Insights Memo:")
@@ -193,22 +233,45 @@ async def demo():
         print("\n8. Interactive analysis with Claude...")
         print("Type 'quit' to exit.")
         
-        while True:
-            query = input("\nEnter a question about the data: ")
-            if query.lower() == 'quit':
-                break
-            
-            response = await client.analyze_with_claude(query)
-            print("\nClaude's response:")
-            print(response)
+        # Input is read off the event loop so background tasks keep running
+        suggestion = None
+        prefetched = {}  # prompt -> task answering it speculatively
+        try:
+            while True:
+                query = await ainput("\nEnter a question about the data: ")
+                if query.lower() == 'quit':
+                    break
+                if not query and suggestion:
+                    query = suggestion
+                
+                # Reuse the speculative answer if the user asked the guessed question
+                task = prefetched.pop(query, None)
+                for stale in prefetched.values():
+                    stale.cancel()
+                prefetched.clear()
+                
+                response = await (task or client.analyze_with_claude(query))
+                print("\nClaude's response:")
+                print(response)
+                
+                # Start answering the likely follow-up while the user reads this
+                # one. The guess may never be asked, so it only gets read-only
+                # tools and can't write to the database or the memo
+                suggestion = guess_follow_up(response)
+                if suggestion:
+                    prefetched[suggestion] = asyncio.create_task(
+                        client.analyze_with_claude(suggestion, read_only=True)
+                    )
+                    print(f"\nSuggested follow-up (press Enter to ask): {suggestion}")
+        finally:
+            for stale in prefetched.values():
+                stale.cancel()
     
     except Exception as e:
         print(f"Error: {str(e)}")
     finally:
-        # Clean up
-        await client.cleanup()
-        print("\nDemo completed. Resources cleaned up.")
+        print("\nDemo completed.")
 
 
 if __name__ == "__main__":
-    asyncio.run(demo()) 
\ No newline at end of file
+    run_with_client(demo) 
\ No newline at end of file
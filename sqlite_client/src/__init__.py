@@ -1,6 +1,7 @@
 """
 SQLite MCP Client package.
 """
-from .client_sqlite import SQLiteMCPClient
+from .client_sqlite import SQLiteMCPClient, invalidate_tools_cache
+from .singleton import get_client, close_client, run_with_client
 
-__all__ = ["SQLiteMCPClient"] 
\ No newline at end of file
+__all__ = ["SQLiteMCPClient", "invalidate_tools_cache", "get_client", "close_client", "run_with_client"] 
\ No newline at end of file
@@ -4,27 +4,211 @@ SQLite MCP Client - Main implementation.
 This client connects to a SQLite MCP server and provides methods
 for executing SQL queries, managing schema, and generating business insights.
 """
+import argparse
+import ast
 import asyncio
+import hashlib
+import os
+import random
+import shutil
 import sys
 import json
-from typing import Optional, Dict, List, Any, Union
-from contextlib import AsyncExitStack
+import threading
+import re
+import time
+import weakref
+from pathlib import Path
+from typing import Optional, Dict, List, Any, AsyncIterator, Set, Tuple, Union
 
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+import orjson
+from mcp import ClientSession, StdioServerParameters, types
 from anthropic import AsyncAnthropic
 from loguru import logger
 
+from .query_handler import bind_query_params, is_comment_only, split_sql_statements
+from .session_pool import SESSION_POOL, ServerParams, close_stale
 from .config import (
     CLAUDE_API_KEY,
     CLAUDE_MODEL,
     MAX_TOKENS,
     DEFAULT_SERVER_PATH,
+    TRANSPORT,
+    SQLITE_PRAGMAS,
+    TOOLS_CACHE_DIR,
+    TOOLS_CACHE_TTL,
+    TOOLS_DISK_CACHE_TTL,
     TIMEOUT_SECONDS,
     RETRY_ATTEMPTS,
-    RETRY_DELAY
+    RETRY_DELAY,
+    MAX_CONCURRENT_TOOL_CALLS,
+    LOG_LEVEL
 )
 
+# Configure the log sink once per process rather than once per client
+logger.remove()
+logger.add(sys.stderr, level=LOG_LEVEL)
+
+# Maximum number of non-blocking insights waiting for the background writer
+INSIGHT_QUEUE_SIZE = 1000
+
+# Upper bound on Claude turns that request tools for a single query
+MAX_TOOL_ROUNDS = 10
+
+# Tools without side effects, the only ones offered to read-only analyses
+READ_ONLY_TOOLS = frozenset(("read_query", "list_tables", "describe_table"))
+
+# Statements that can change the schema and so invalidate the schema cache
+_DDL_RE = re.compile(r'\b(CREATE|ALTER|DROP|RENAME)\b', re.IGNORECASE)
+
+# Reads of the schema catalog, whose results only change with DDL. Every FROM
+# and JOIN source must be a catalog object, and the column list, join
+# conditions and filters may not contain subqueries, so data is never cached
+_CATALOG_SOURCE = (
+    r"(?:sqlite_master|sqlite_schema"
+    r"|pragma_(?:table_info|table_xinfo|index_list|index_info|index_xinfo|foreign_key_list)"
+    r"\s*\([\w\s.,'\"]*\))"
+    r"(?:\s+(?:AS\s+)?\w+)?"
+)
+_META_QUERY_RE = re.compile(rf'''
+    ^\s*SELECT\s+[\w\s,.*"]+?
+    \s+FROM\s+{_CATALOG_SOURCE}
+    (?:\s*(?:,|(?:(?:LEFT|INNER|CROSS)\s+)?JOIN)\s*{_CATALOG_SOURCE}
+       (?:\s+ON\s+(?:(?!\b(?:SELECT|FROM|JOIN)\b)[^;()])+)?)*
+    (?:\s+WHERE\s+(?:(?!\b(?:SELECT|FROM|JOIN)\b)[^;])+)?
+    (?:\s+ORDER\s+BY\s+[\w\s,.]+)?
+    \s*;?\s*$
+''', re.IGNORECASE | re.VERBOSE)
+
+# Every table with its PRAGMA table_info rows, in one read_query
+_SCHEMA_SNAPSHOT_SQL = (
+    "SELECT m.name AS table_name, p.* "
+    "FROM sqlite_master AS m JOIN pragma_table_info(m.name) AS p "
+    "WHERE m.type = 'table' ORDER BY m.rowid, p.cid"
+)
+
+# Tools listed per server (command + args, which include the db path), shared
+# by every client in the process: key -> (time.monotonic() when listed, tools)
+_TOOLS_CACHE: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+
+
+def _tools_cache_key(server_params: ServerParams) -> str:
+    """Build the in-process tools cache key for a server."""
+    if isinstance(server_params, str):
+        return hashlib.sha1(server_params.encode()).hexdigest()
+    return hashlib.sha1(f"{server_params.command}|{server_params.args}".encode()).hexdigest()
+
+
+def invalidate_tools_cache(key: Optional[str] = None):
+    """Drop cached tool lists so the next connect lists tools again.
+    
+    Args:
+        key: Cache key of a single server, or None to drop every entry
+    """
+    if key is None:
+        _TOOLS_CACHE.clear()
+    else:
+        _TOOLS_CACHE.pop(key, None)
+
+
+async def ainput(prompt: str = "") -> str:
+    """Read a line from stdin without blocking the event loop.
+    
+    The read runs on a daemon thread rather than the default executor, whose
+    threads are joined at shutdown and would keep Ctrl+C waiting for Enter.
+    
+    Args:
+        prompt: Prompt written before reading
+        
+    Returns:
+        The line read, without the trailing newline
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def settle(result=None, error=None):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    
+    def read():
+        try:
+            line = input(prompt)
+        except BaseException as e:
+            loop.call_soon_threadsafe(settle, None, e)
+        else:
+            loop.call_soon_threadsafe(settle, line)
+    
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
+
+def _tool_error(result: types.CallToolResult) -> Optional[str]:
+    """Return the error a tool call reported instead of raising, if any.
+    
+    Besides setting isError, the SQLite servers report failures as text
+    starting with "Error:" or "Database error:".
+    
+    Args:
+        result: Result of session.call_tool()
+        
+    Returns:
+        The error text, or None if the call succeeded
+    """
+    text = " ".join(getattr(content, "text", "") for content in result.content)
+    if result.isError or text.startswith(("Error:", "Database error:")):
+        return text or "tool call failed"
+    return None
+
+
+class _SchemaCache:
+    """Table list, table descriptions and catalog query results of one server."""
+    
+    def __init__(self):
+        self.tables: Optional[List[str]] = None
+        self.descriptions: Dict[str, List[Dict[str, str]]] = {}
+        self.meta: Dict[str, List[Dict[str, Any]]] = {}
+    
+    def clear(self):
+        """Forget everything, so it is fetched again."""
+        self.tables = None
+        self.descriptions.clear()
+        self.meta.clear()
+
+
+# Schema caches keyed by pooled server session, so a schema change made by
+# one client is seen by every client sharing the session
+_SCHEMA_CACHES: "weakref.WeakKeyDictionary[ClientSession, _SchemaCache]" = weakref.WeakKeyDictionary()
+
+
+# Claude client shared by every SQLiteMCPClient on the running event loop.
+# Its connection pool is bound to the loop that created it, so a later
+# asyncio.run() gets a new client, as the session pool does.
+_ANTHROPIC: Optional[AsyncAnthropic] = None
+_ANTHROPIC_LOOP: Optional[asyncio.AbstractEventLoop] = None
+# Closes of replaced clients still running, referenced so they aren't collected
+_STALE_CLOSES: Set[asyncio.Task] = set()
+
+
+def _get_anthropic() -> AsyncAnthropic:
+    """Return the Claude client for the running event loop, creating it on first use.
+    
+    A client created on an earlier loop is closed in the background.
+    """
+    global _ANTHROPIC, _ANTHROPIC_LOOP
+    loop = asyncio.get_running_loop()
+    if _ANTHROPIC_LOOP is not loop:
+        if _ANTHROPIC is not None:
+            task = loop.create_task(close_stale(_ANTHROPIC.close(), "Claude client"))
+            _STALE_CLOSES.add(task)
+            task.add_done_callback(_STALE_CLOSES.discard)
+        _ANTHROPIC = AsyncAnthropic()
+        _ANTHROPIC_LOOP = loop
+    return _ANTHROPIC
+
+
 class SQLiteMCPClient:
     """Client for interacting with SQLite MCP Server."""
     
@@ -32,64 +216,111 @@ class SQLiteMCPClient:
         """Initialize the SQLite MCP client."""
         # Initialize session and client objects
         self.session: Optional[ClientSession] = None
-        self.exit_stack = AsyncExitStack()
-        self.anthropic = AsyncAnthropic()
+        self._server_params: Optional[ServerParams] = None
+        self._anthropic: Optional[AsyncAnthropic] = None
         self.tools_cache = None
+        self._tools_json: Optional[bytes] = None
+        self._tools_cache_key: Optional[str] = None
+        self._tools_cache_file: Optional[Path] = None
+        self._tools_changed = False
+        
+        # Schema cache, shared with every client of the same server session
+        # once connected and cleared whenever a statement may change the schema
+        self._schema = _SchemaCache()
         
         # Local storage for insights
         self._insights = []
         
-        # Configure logger
-        logger.remove()
-        logger.add(sys.stderr, level="INFO")
+        # Non-blocking insights are sent in order by one background writer
+        self._insight_queue: Optional[asyncio.Queue] = None
+        self._insight_writer: Optional[asyncio.Task] = None
+        
+        # Per-client RNG for retry jitter, so clients don't retry in lockstep
+        self._rng = random.Random(os.getpid() ^ threading.get_ident() ^ id(self))
+        
+        # Bounds concurrent tool calls; bound to the loop it was created on
+        self._tool_slots: Optional[asyncio.Semaphore] = None
+        self._tool_slots_loop: Optional[asyncio.AbstractEventLoop] = None
     
-    async def connect_to_server(self, server_script_path: str = DEFAULT_SERVER_PATH, db_path: str = None):
+    @property
+    def anthropic(self) -> AsyncAnthropic:
+        """Claude client, created lazily so SQL-only use never builds one.
+        
+        Unless one was assigned, this is the shared client of the running loop.
+        """
+        if self._anthropic is None:
+            return _get_anthropic()
+        return self._anthropic
+    
+    @anthropic.setter
+    def anthropic(self, client: AsyncAnthropic):
+        self._anthropic = client
+    
+    async def connect_to_server(self, server_script_path: str = DEFAULT_SERVER_PATH, db_path: str = None,
+                                transport: str = TRANSPORT):
         """Connect to the SQLite MCP server.
         
         Args:
-            server_script_path: Path to the server script or command
-            db_path: Path to the SQLite database file
+            server_script_path: Path to the server script or command, or the
+                URL of a Streamable HTTP server
+            db_path: Path to the SQLite database file (stdio servers only)
+            transport: "stdio", "http", or "auto" to pick HTTP for http(s):// URLs
         """
-        logger.info(f"Connecting to SQLite MCP server: {server_script_path}")
+        logger.info("Connecting to SQLite MCP server: {}", server_script_path)
         
-        # Determine if it's a Python script or a command
-        is_python = server_script_path.endswith('.py')
+        if transport == "auto":
+            transport = "http" if server_script_path.startswith(("http://", "https://")) else "stdio"
+        if transport not in ("stdio", "http"):
+            raise ValueError(f"Unknown transport: {transport}")
         
-        # Set up command and arguments
-        if is_python:
-            command = "python"
-            args = [server_script_path]
+        if transport == "http":
+            # The server process owns its database, so there is nothing to pass
+            if db_path:
+                logger.warning("Ignoring db_path {} for HTTP server", db_path)
+                db_path = None
+            server_params: ServerParams = server_script_path
         else:
-            command = server_script_path
-            args = []
-        
-        # Add database path if provided
-        if db_path:
-            args.extend(["--db-path", db_path])
-        
-        # Set up server parameters
-        server_params = StdioServerParameters(
-            command=command,
-            args=args,
-            env=None
-        )
+            # Determine if it's a Python script or a command
+            is_python = server_script_path.endswith('.py')
+            
+            # Set up command and arguments
+            if is_python:
+                command = "python"
+                args = [server_script_path]
+            else:
+                command = server_script_path
+                args = []
+            
+            # Add database path if provided
+            if db_path:
+                db_path = os.path.expanduser(db_path)
+                args.extend(["--db-path", db_path])
+            
+            # Set up server parameters
+            server_params = StdioServerParameters(
+                command=command,
+                args=args,
+                env=None
+            )
+        self._tools_cache_key = _tools_cache_key(server_params)
         
-        # Connect to the server
+        # Connect to the server, sharing an initialized session if one is already running
         try:
-            stdio_transport = await self.exit_stack.enter_async_context(stdio_client(server_params))
-            self.stdio, self.write = stdio_transport
-            self.session = await self.exit_stack.enter_async_context(ClientSession(self.stdio, self.write))
+            self.session = await SESSION_POOL.acquire(server_params, self._handle_server_message)
+            self._server_params = server_params
+            self._schema = _SCHEMA_CACHES.setdefault(self.session, _SchemaCache())
             
-            # Initialize the session
-            await self.session.initialize()
+            # Cache available tools, reusing a tool list listed earlier
+            await self._get_tools(server_script_path)
             
-            # Cache available tools
-            await self._cache_tools()
+            # Tune SQLite for write throughput, once per server connection
+            if SESSION_POOL.claim_setup(server_params):
+                await self._apply_pragmas(db_path)
             
-            logger.info(f"Connected to server with tools: {[tool['name'] for tool in self.tools_cache]}")
+            logger.opt(lazy=True).info("Connected to server with tools: {}", lambda: [tool['name'] for tool in self.tools_cache])
             return True
         except Exception as e:
-            logger.error(f"Failed to connect to server: {str(e)}")
+            logger.error("Failed to connect to server: {}", e)
             await self.cleanup()
             raise
     
@@ -104,10 +335,191 @@ class SQLiteMCPClient:
             "description": tool.description,
             "input_schema": tool.inputSchema
         } for tool in response.tools]
+        # Serialized once, in the shape sent to Claude, for persisting to disk
+        self._tools_json = orjson.dumps(self.tools_cache)
+    
+    async def _get_tools(self, server_script_path: str):
+        """Fill tools_cache from the in-process cache, falling back to disk and then the server.
+        
+        Args:
+            server_script_path: Path to the server script or command
+        """
+        cached = _TOOLS_CACHE.get(self._tools_cache_key)
+        if cached is not None and time.monotonic() - cached[0] < TOOLS_CACHE_TTL:
+            logger.debug("Reusing tools listed earlier in this process")
+            self.tools_cache = cached[1]
+            return
+        
+        await self._load_tools_cache(server_script_path)
+        _TOOLS_CACHE[self._tools_cache_key] = (time.monotonic(), self.tools_cache)
+    
+    async def _handle_server_message(self, message):
+        """Note tool list changes announced by the server."""
+        if isinstance(message, types.ServerNotification) and isinstance(message.root, types.ToolListChangedNotification):
+            logger.info("Server reported a tool list change")
+            self._tools_changed = True
+    
+    async def _load_tools_cache(self, server_script_path: str):
+        """Load the tools cache from disk, fetching it from the server on a miss.
+        
+        The cache file is keyed by the resolved server path and its
+        modification time, so reinstalling or editing the server invalidates it.
+        Console-script and pyenv shims keep their mtime when the server code
+        changes, so files older than TOOLS_DISK_CACHE_TTL are also ignored.
+        
+        Args:
+            server_script_path: Path to the server script or command
+        """
+        resolved_path = shutil.which(server_script_path) or server_script_path
+        try:
+            mtime = os.path.getmtime(resolved_path)
+        except OSError:
+            # Can't tell when the server changes, so don't persist its tools
+            await self._cache_tools()
+            return
+        
+        cache_key = hashlib.sha256(f"{os.path.abspath(resolved_path)}:{mtime}".encode()).hexdigest()[:16]
+        cache_file = Path(TOOLS_CACHE_DIR).expanduser() / f"sqlite_mcp_tools_{cache_key}.json"
+        self._tools_cache_file = cache_file
+        
+        try:
+            if time.time() - cache_file.stat().st_mtime >= TOOLS_DISK_CACHE_TTL:
+                raise OSError("tools cache expired")
+            self._tools_json = cache_file.read_bytes()
+            self.tools_cache = orjson.loads(self._tools_json)
+            logger.debug("Loaded tools cache from {}", cache_file)
+            return
+        except (OSError, ValueError):
+            pass
+        
+        await self._cache_tools()
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            cache_file.write_bytes(self._tools_json)
+        except OSError as e:
+            logger.warning("Could not write tools cache {}: {}", cache_file, e)
+    
+    async def _apply_pragmas(self, db_path: Optional[str] = None):
+        """Apply the configured SQLITE_PRAGMAS to the server's database.
+        
+        The PRAGMAs are sent concurrently and failures, whether raised or
+        reported as a tool error, are only logged, since they tune performance
+        and are not required for correctness.
+        
+        Only journal_mode is stored in the database file. The other PRAGMAs
+        (synchronous, cache_size, temp_store, ...) hold for the server's
+        connection, so they last only on servers that keep one connection
+        open, like the bundled server. The upstream mcp-server-sqlite opens a
+        connection per query and drops them right away.
+        
+        Args:
+            db_path: Path to the SQLite database file, if one was given
+        """
+        pragmas = SQLITE_PRAGMAS
+        if db_path == ":memory:":
+            # In-memory databases have no journal file to switch to WAL
+            pragmas = [p for p in pragmas if not p.lower().startswith("journal_mode")]
+        if not pragmas:
+            return
+        
+        logger.info("Applying SQLite PRAGMAs: {}", pragmas)
+        results = await asyncio.gather(
+            *(
+                self.call_with_timeout(self.session.call_tool("write_query", {"query": f"PRAGMA {pragma}"}))
+                for pragma in pragmas
+            ),
+            return_exceptions=True
+        )
+        for pragma, result in zip(pragmas, results):
+            if not isinstance(result, Exception):
+                result = _tool_error(result)
+            if result is not None:
+                logger.warning("Failed to apply PRAGMA {}: {}", pragma, result)
+    
+    def _has_tool(self, tool_name: str) -> bool:
+        """Check whether the connected server provides a tool."""
+        return any(tool["name"] == tool_name for tool in self.tools_cache or [])
+    
+    def refresh_schema(self):
+        """Drop cached table lists and descriptions so they are fetched again.
+        
+        The cache is shared by every client of the server session, so they
+        all see the change.
+        """
+        self._schema.clear()
+    
+    def _invalidate_schema_on_ddl(self, query: str):
+        """Refresh the schema cache if a statement may change the schema."""
+        if _DDL_RE.search(query):
+            self.refresh_schema()
+    
+    @staticmethod
+    def _meta_cache_key(query: str) -> Optional[str]:
+        """Return the meta cache key for a schema catalog query, or None for other queries."""
+        return " ".join(query.split()) if _META_QUERY_RE.match(query) else None
+    
+    async def _call_claude_tool(self, name: str, arguments: Dict[str, Any], read_only: bool = False) -> Any:
+        """Run a tool Claude requested, going through the client's schema caches.
+        
+        Schema lookups are answered from the caches when possible and fill
+        them otherwise; writes that may change the schema invalidate them.
+        Errors are raised so they can be reported back to Claude.
+        
+        Args:
+            name: Name of the tool
+            arguments: Tool arguments
+            read_only: Refuse tools that are not in READ_ONLY_TOOLS
+            
+        Returns:
+            Parsed tool result
+        """
+        if read_only and name not in READ_ONLY_TOOLS:
+            raise PermissionError(f"Tool {name} is not available in read-only mode")
+        
+        meta_key = None
+        if name == "list_tables":
+            if self._schema.tables is not None:
+                return [{"name": table} for table in self._schema.tables]
+        elif name == "describe_table":
+            cached = self._schema.descriptions.get(arguments.get("table_name"))
+            if cached is not None:
+                return cached
+        elif name == "read_query":
+            meta_key = self._meta_cache_key(arguments.get("query", ""))
+            if meta_key is not None and meta_key in self._schema.meta:
+                return self._schema.meta[meta_key]
+        elif name in ("create_table", "write_query", "write_script", "write_many"):
+            statement = arguments.get("script") or arguments.get("query", "")
+            if name == "create_table":
+                self.refresh_schema()
+            else:
+                self._invalidate_schema_on_ddl(statement)
+            try:
+                return await self.call_tool_with_retry(name, arguments)
+            finally:
+                # Lookups running alongside the write may have cached the old schema
+                if name == "create_table":
+                    self.refresh_schema()
+                else:
+                    self._invalidate_schema_on_ddl(statement)
+        
+        result = await self.call_tool_with_retry(name, arguments)
+        if isinstance(result, list):
+            if name == "list_tables":
+                self._schema.tables = [table["name"] for table in result if isinstance(table, dict) and "name" in table]
+            elif name == "describe_table":
+                self._schema.descriptions[arguments.get("table_name")] = result
+            elif meta_key is not None:
+                self._schema.meta[meta_key] = result
+        return result
     
     async def execute_read_query(self, query: str) -> List[Dict[str, Any]]:
         """Execute a SELECT query.
         
+        Empty and comment-only queries return no rows without a round-trip.
+        Queries against sqlite_master or pragma table functions are cached
+        like list_tables().
+        
         Args:
             query: SQL SELECT query
             
@@ -117,16 +529,76 @@ class SQLiteMCPClient:
         if not self.session:
             raise RuntimeError("Not connected to server")
         
-        logger.info(f"Executing read query: {query}")
+        if is_comment_only(query):
+            return []
+        
+        meta_key = self._meta_cache_key(query)
+        if meta_key is not None and meta_key in self._schema.meta:
+            return self._schema.meta[meta_key]
+        
+        logger.info("Executing read query: {}", query)
         try:
             result = await self.call_tool_with_retry("read_query", {"query": query})
             if isinstance(result, list):
+                if meta_key is not None:
+                    self._schema.meta[meta_key] = result
                 return result
             return []
         except Exception as e:
-            logger.error(f"Error executing read query: {str(e)}")
+            logger.error("Error executing read query: {}", e)
             return []
     
+    async def execute_read_query_stream(
+        self, query: str, page_size: int = 1000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Execute a SELECT query and yield its rows page by page.
+        
+        The query is wrapped in LIMIT/OFFSET pages, so at most page_size rows
+        are held in memory at a time and the first rows arrive without waiting
+        for the full result set. Order across pages is only stable if the
+        query has an ORDER BY.
+        
+        Args:
+            query: SQL SELECT query
+            page_size: Number of rows fetched per round-trip
+            
+        Yields:
+            Result rows as dictionaries
+            
+        Raises:
+            ValueError: If the query holds more than one statement
+            RuntimeError: If a page could not be read, rather than ending the
+                stream early as if the rows had run out
+        """
+        if not self.session:
+            raise RuntimeError("Not connected to server")
+        
+        # Trailing semicolons and comment-only statements can't go inside the
+        # subquery; the tokenizer-based split leaves string literals intact
+        statements = split_sql_statements(query)
+        if not statements:
+            return
+        if len(statements) > 1:
+            raise ValueError("Streaming supports a single SELECT statement")
+        base_query = statements[0]
+        
+        logger.info("Streaming read query: {}", base_query)
+        offset = 0
+        while True:
+            # The closing parenthesis goes on its own line so a trailing
+            # -- comment in the query cannot swallow it
+            page = await self.call_tool_with_retry(
+                "read_query",
+                {"query": f"SELECT * FROM ({base_query}\n) LIMIT {page_size} OFFSET {offset}"}
+            )
+            if not isinstance(page, list):
+                raise RuntimeError(f"Streaming read query failed: {page}")
+            for row in page:
+                yield row
+            if len(page) < page_size:
+                break
+            offset += page_size
+    
     async def execute_write_query(self, query: str) -> Dict[str, int]:
         """Execute an INSERT, UPDATE, or DELETE query.
         
@@ -139,14 +611,83 @@ class SQLiteMCPClient:
         if not self.session:
             raise RuntimeError("Not connected to server")
         
-        logger.info(f"Executing write query: {query}")
+        logger.info("Executing write query: {}", query)
+        self._invalidate_schema_on_ddl(query)
         try:
             result = await self.call_tool_with_retry("write_query", {"query": query})
             if isinstance(result, list) and len(result) > 0:
                 return result[0]
             return {"affected_rows": 0}
         except Exception as e:
-            logger.error(f"Error executing write query: {str(e)}")
+            logger.error("Error executing write query: {}", e)
+            return {"affected_rows": 0}
+    
+    async def execute_script(self, script: str) -> Dict[str, int]:
+        """Execute several write statements in a single round-trip.
+        
+        The server runs the whole script in one transaction. Servers without
+        the write_script tool get one write_query call per statement instead.
+        
+        Args:
+            script: Semicolon-separated INSERT, UPDATE, DELETE or DDL statements
+            
+        Returns:
+            Dictionary with the total affected_rows count
+        """
+        if not self.session:
+            raise RuntimeError("Not connected to server")
+        
+        self._invalidate_schema_on_ddl(script)
+        if not self._has_tool("write_script"):
+            affected_rows = 0
+            for statement in split_sql_statements(script):
+                result = await self.execute_write_query(statement)
+                affected_rows += result.get("affected_rows", 0)
+            return {"affected_rows": affected_rows}
+        
+        logger.info("Executing write script: {}", script)
+        try:
+            result = await self.call_tool_with_retry("write_script", {"script": script})
+            if isinstance(result, list) and len(result) > 0:
+                return result[0]
+            return {"affected_rows": 0}
+        except Exception as e:
+            logger.error("Error executing write script: {}", e)
+            return {"affected_rows": 0}
+    
+    async def execute_many(self, query: str, rows: List[List[Any]]) -> Dict[str, int]:
+        """Execute a parameterized write query once per row in a single round-trip.
+        
+        The server binds every row to one prepared statement inside a single
+        transaction. Servers without the write_many tool get one write_query
+        call per row, with the values inlined as SQL literals.
+        
+        Args:
+            query: SQL INSERT, UPDATE, or DELETE query with ? placeholders
+            rows: Parameter values for each execution
+            
+        Returns:
+            Dictionary with the total affected_rows count
+        """
+        if not self.session:
+            raise RuntimeError("Not connected to server")
+        
+        self._invalidate_schema_on_ddl(query)
+        if not self._has_tool("write_many"):
+            affected_rows = 0
+            for row in rows:
+                result = await self.execute_write_query(bind_query_params(query, row))
+                affected_rows += result.get("affected_rows", 0)
+            return {"affected_rows": affected_rows}
+        
+        logger.info("Executing write query for {} rows: {}", len(rows), query)
+        try:
+            result = await self.call_tool_with_retry("write_many", {"query": query, "rows": rows})
+            if isinstance(result, list) and len(result) > 0:
+                return result[0]
+            return {"affected_rows": 0}
+        except Exception as e:
+            logger.error("Error executing batched write query: {}", e)
             return {"affected_rows": 0}
     
     async def create_table(self, query: str) -> Dict[str, str]:
@@ -161,36 +702,46 @@ class SQLiteMCPClient:
         if not self.session:
             raise RuntimeError("Not connected to server")
         
-        logger.info(f"Creating table: {query}")
+        logger.info("Creating table: {}", query)
+        self.refresh_schema()
         try:
             result = await self.call_tool_with_retry("create_table", {"query": query})
             return {"message": result if isinstance(result, str) else str(result)}
         except Exception as e:
-            logger.error(f"Error creating table: {str(e)}")
+            logger.error("Error creating table: {}", e)
             return {"message": f"Error: {str(e)}"}
     
     async def list_tables(self) -> List[str]:
         """Get a list of all tables in the database.
         
+        The list is cached until a schema-changing statement is run through
+        any client sharing the server session, or refresh_schema() is called.
+        
         Returns:
             List of table names
         """
         if not self.session:
             raise RuntimeError("Not connected to server")
         
+        if self._schema.tables is not None:
+            return self._schema.tables
+        
         logger.info("Listing tables")
         try:
             result = await self.call_tool_with_retry("list_tables", {})
             if isinstance(result, list):
-                return [table["name"] for table in result if isinstance(table, dict) and "name" in table]
+                self._schema.tables = [table["name"] for table in result if isinstance(table, dict) and "name" in table]
+                return self._schema.tables
             return []
         except Exception as e:
-            logger.error(f"Error listing tables: {str(e)}")
+            logger.error("Error listing tables: {}", e)
             return []
     
     async def describe_table(self, table_name: str) -> List[Dict[str, str]]:
         """Get schema information for a table.
         
+        The description is cached like list_tables().
+        
         Args:
             table_name: Name of the table to describe
             
@@ -200,17 +751,53 @@ class SQLiteMCPClient:
         if not self.session:
             raise RuntimeError("Not connected to server")
         
-        logger.info(f"Describing table: {table_name}")
+        cached = self._schema.descriptions.get(table_name)
+        if cached is not None:
+            return cached
+        
+        logger.info("Describing table: {}", table_name)
         try:
             result = await self.call_tool_with_retry("describe_table", {"table_name": table_name})
             if isinstance(result, list):
+                self._schema.descriptions[table_name] = result
                 return result
             return []
         except Exception as e:
-            logger.error(f"Error describing table: {str(e)}")
+            logger.error("Error describing table: {}", e)
             return []
     
-    async def append_insight(self, insight: str, blocking: bool = True) -> Dict[str, str]:
+    async def snapshot_schema(self) -> Dict[str, List[Dict[str, str]]]:
+        """Get every table and its columns in a single round-trip.
+        
+        Replaces list_tables() followed by describe_table() for each table.
+        The result fills the same caches, so later calls to either are free.
+        
+        Returns:
+            Dictionary mapping table names to their column definitions
+        """
+        if not self.session:
+            raise RuntimeError("Not connected to server")
+        
+        if self._schema.tables is not None and all(table in self._schema.descriptions for table in self._schema.tables):
+            return {table: self._schema.descriptions[table] for table in self._schema.tables}
+        
+        logger.info("Snapshotting schema")
+        try:
+            rows = await self.call_tool_with_retry("read_query", {"query": _SCHEMA_SNAPSHOT_SQL})
+        except Exception as e:
+            logger.error("Error snapshotting schema: {}", e)
+            return {}
+        if not isinstance(rows, list):
+            return {}
+        
+        schema: Dict[str, List[Dict[str, str]]] = {}
+        for row in rows:
+            schema.setdefault(row.pop("table_name"), []).append(row)
+        self._schema.tables = list(schema)
+        self._schema.descriptions.update(schema)
+        return schema
+    
+    async def append_insight(self, insight: str, blocking: bool = True) -> Dict[str, Any]:
         """Add a business insight to the memo resource.
         
         Args:
@@ -218,27 +805,32 @@ class SQLiteMCPClient:
             blocking: Whether to wait for the operation to complete
             
         Returns:
-            Confirmation message
+            Confirmation message. Non-blocking calls also include a "future"
+            that completes once the server has processed the insight, or
+            raises the error if the insight could not be added.
         """
         if not self.session:
             raise RuntimeError("Not connected to server")
         
-        logger.info(f"Appending insight: {insight}")
+        logger.info("Appending insight: {}", insight)
         
         # Store locally for backup
         self._insights.append(insight)
         
         if not blocking:
-            # Create a task and return immediately
-            asyncio.create_task(self._append_insight_task(insight))
-            return {"message": "Insight submission started (non-blocking)"}
+            # Queue the insight for the background writer and return immediately;
+            # awaiting the returned future replaces sleeping for a guessed amount of time
+            if self._insight_writer is None or self._insight_writer.done():
+                self._insight_queue = asyncio.Queue(maxsize=INSIGHT_QUEUE_SIZE)
+                self._insight_writer = asyncio.create_task(self._insight_writer_loop())
+            future = asyncio.get_running_loop().create_future()
+            await self._insight_queue.put((insight, future))
+            return {"message": "Insight submission started (non-blocking)", "future": future}
         
         try:
             # Use a direct call with a shorter timeout
-            result = await asyncio.wait_for(
-                self.session.call_tool("append_insight", {"insight": insight}),
-                timeout=5
-            )
+            async with asyncio.timeout(5):
+                result = await self.session.call_tool("append_insight", {"insight": insight})
             
             # Parse the result
             if hasattr(result, "content") and isinstance(result.content, list) and len(result.content) > 0:
@@ -250,26 +842,105 @@ class SQLiteMCPClient:
             logger.warning("Append insight timed out, but the operation may have succeeded")
             return {"message": "Insight submission timed out, but may have succeeded"}
         except Exception as e:
-            logger.error(f"Error appending insight: {str(e)}")
+            logger.error("Error appending insight: {}", e)
             return {"message": f"Error: {str(e)}"}
     
+    async def _insight_writer_loop(self):
+        """Send queued non-blocking insights to the server one at a time."""
+        queue = self._insight_queue
+        while True:
+            insight, future = await queue.get()
+            try:
+                await self._append_insight_task(insight)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(None)
+            finally:
+                queue.task_done()
+    
+    async def _stop_insight_writer(self):
+        """Let the writer send queued insights, then stop it."""
+        if self._insight_writer is None:
+            return
+        queue = self._insight_queue
+        try:
+            async with asyncio.timeout(5):
+                await queue.join()
+        except asyncio.TimeoutError:
+            logger.warning("Dropping {} queued insights that were not sent in time", queue.qsize())
+        self._insight_writer.cancel()
+        while not queue.empty():
+            _, future = queue.get_nowait()
+            future.cancel()
+        self._insight_writer = None
+        self._insight_queue = None
+    
     async def _append_insight_task(self, insight: str):
         """Background task for appending insights.
         
         Args:
             insight: Business insight text
+            
+        Raises:
+            TimeoutError: If the server did not answer in time; the insight
+                may still have been added
+            RuntimeError: If the server reported an error
         """
         try:
             # Use a direct call with a shorter timeout
-            result = await asyncio.wait_for(
-                self.session.call_tool("append_insight", {"insight": insight}),
-                timeout=5
-            )
-            logger.info(f"Background insight added successfully")
+            async with asyncio.timeout(5):
+                error = _tool_error(await self.session.call_tool("append_insight", {"insight": insight}))
+            if error is not None:
+                raise RuntimeError(error)
+            logger.info("Background insight added successfully")
         except asyncio.TimeoutError:
             logger.warning("Background insight submission timed out, but may have succeeded")
+            raise
         except Exception as e:
-            logger.error(f"Error in background insight task: {str(e)}")
+            logger.error("Error in background insight task: {}", e)
+            raise
+    
+    async def append_insight_and_fetch(self, insight: str) -> str:
+        """Add a business insight and return the updated memo in one round-trip.
+        
+        Servers without the append_and_get_memo tool get separate
+        append_insight and get_insights_memo calls instead.
+        
+        Args:
+            insight: Business insight text
+            
+        Returns:
+            The updated memo content as a string
+        """
+        if not self.session:
+            raise RuntimeError("Not connected to server")
+        
+        if not self._has_tool("append_and_get_memo"):
+            await self.append_insight(insight)
+            return await self.get_insights_memo()
+        
+        logger.info("Appending insight and fetching memo: {}", insight)
+        
+        # Store locally for backup
+        self._insights.append(insight)
+        
+        try:
+            async with asyncio.timeout(5):
+                result = await self.session.call_tool("append_and_get_memo", {"insight": insight})
+            
+            if hasattr(result, "content") and isinstance(result.content, list) and len(result.content) > 0:
+                if hasattr(result.content[0], "text"):
+                    return result.content[0].text
+            return str(result)
+        except Exception as e:
+            logger.warning("Append and fetch failed: {}, using local insights", e)
+            return self._local_insights_memo()
     
     async def get_insights_memo(self) -> str:
         """Get the current business insights memo.
@@ -285,10 +956,8 @@ class SQLiteMCPClient:
         try:
             # Try with read_resource first
             try:
-                result = await asyncio.wait_for(
-                    self.session.read_resource("memo://insights"),
-                    timeout=5
-                )
+                async with asyncio.timeout(5):
+                    result = await self.session.read_resource("memo://insights")
                 
                 # Parse the result
                 if hasattr(result, "content"):
@@ -298,32 +967,38 @@ class SQLiteMCPClient:
                     return str(content)
                 return str(result)
             except Exception as e:
-                logger.warning(f"Server memo retrieval failed: {str(e)}, using local insights")
+                logger.warning("Server memo retrieval failed: {}, using local insights", e)
                 
                 # Fall back to locally stored insights
-                if not self._insights:
-                    return "No business insights have been discovered yet."
-                
-                insights = "\n".join(f"- {insight}" for insight in self._insights)
-                
-                memo = "📊 Business Intelligence Memo 📊\n\n"
-                memo += "Key Insights Discovered:\n\n"
-                memo += insights
-                
-                if len(self._insights) > 1:
-                    memo += "\n\nSummary:\n"
-                    memo += f"Analysis has revealed {len(self._insights)} key business insights that suggest opportunities for strategic optimization and growth."
-                
-                return memo
+                return self._local_insights_memo()
         except Exception as e:
-            logger.error(f"Error retrieving insights memo: {str(e)}")
+            logger.error("Error retrieving insights memo: {}", e)
             return f"Error retrieving memo: {str(e)}"
     
-    async def analyze_with_claude(self, query: str) -> str:
+    def _local_insights_memo(self) -> str:
+        """Build the insights memo from locally stored insights.
+        
+        Returns:
+            The memo content as a string
+        """
+        count = len(self._insights)
+        if not count:
+            return "No business insights have been discovered yet."
+        
+        body = "\n".join([f"- {insight}" for insight in self._insights])
+        summary = (
+            f"\n\nSummary:\nAnalysis has revealed {count} key business insights that suggest opportunities for strategic optimization and growth."
+            if count > 1 else ""
+        )
+        return f"📊 Business Intelligence Memo 📊\n\nKey Insights Discovered:\n\n{body}{summary}"
+    
+    async def analyze_with_claude(self, query: str, read_only: bool = False) -> str:
         """Process a query using Claude and available tools.
         
         Args:
             query: The user's query
+            read_only: Only offer tools without side effects (READ_ONLY_TOOLS),
+                e.g. for speculative runs whose answer may be discarded
             
         Returns:
             Claude's response with tool results
@@ -331,62 +1006,72 @@ class SQLiteMCPClient:
         if not self.session or not self.tools_cache:
             raise RuntimeError("Not connected to server or tools not cached")
         
+        tools = self.tools_cache
+        if read_only:
+            tools = [tool for tool in tools if tool["name"] in READ_ONLY_TOOLS]
+        
         try:
             messages = [{"role": "user", "content": query}]
-            
-            # Initial Claude API call
-            response = await self.anthropic.messages.create(
-                model=CLAUDE_MODEL,
-                max_tokens=MAX_TOKENS,
-                messages=messages,
-                tools=self.tools_cache
-            )
-            
-            # Process response and handle tool calls
             final_text = []
             
-            assistant_message_content = []
-            for content in response.content:
-                if content.type == 'text':
-                    final_text.append(content.text)
-                    assistant_message_content.append(content)
-                elif content.type == 'tool_use':
-                    tool_name = content.name
-                    tool_args = content.input
-                    
-                    # Execute tool call
-                    result = await self.call_tool_with_retry(tool_name, tool_args)
-                    final_text.append(f"[Calling tool {tool_name} with args {tool_args}]")
-                    
-                    assistant_message_content.append(content)
-                    messages.append({
-                        "role": "assistant",
-                        "content": assistant_message_content
-                    })
-                    messages.append({
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "tool_result",
-                                "tool_use_id": content.id,
-                                "content": result
-                            }
-                        ]
-                    })
-                    
-                    # Get next response from Claude
-                    response = await self.anthropic.messages.create(
+            for _ in range(MAX_TOOL_ROUNDS):
+                # Stream the turn and start each tool as soon as its tool_use
+                # block is complete, while Claude is still generating the rest
+                tool_uses = []
+                tool_tasks = []
+                try:
+                    async with self.anthropic.messages.stream(
                         model=CLAUDE_MODEL,
                         max_tokens=MAX_TOKENS,
                         messages=messages,
-                        tools=self.tools_cache
-                    )
-                    
-                    final_text.append(response.content[0].text)
+                        tools=tools
+                    ) as stream:
+                        async for event in stream:
+                            if event.type == "content_block_stop" and event.content_block.type == "tool_use":
+                                tool_use = event.content_block
+                                tool_uses.append(tool_use)
+                                tool_tasks.append(asyncio.create_task(
+                                    self._call_claude_tool(tool_use.name, tool_use.input, read_only)
+                                ))
+                        response = await stream.get_final_message()
+                except BaseException:
+                    for task in tool_tasks:
+                        task.cancel()
+                    raise
+                
+                for content in response.content:
+                    if content.type == 'text':
+                        final_text.append(content.text)
+                    elif content.type == 'tool_use':
+                        final_text.append(f"[Calling tool {content.name} with args {orjson.dumps(content.input).decode()}]")
+                if not tool_uses:
+                    break
+                
+                # Answer every tool requested in this turn in a single message
+                results = await asyncio.gather(*tool_tasks, return_exceptions=True)
+                tool_results = []
+                for tool_use, result in zip(tool_uses, results):
+                    if isinstance(result, Exception):
+                        tool_results.append({
+                            "type": "tool_result",
+                            "tool_use_id": tool_use.id,
+                            "content": f"Error: {str(result)}",
+                            "is_error": True
+                        })
+                    else:
+                        tool_results.append({
+                            "type": "tool_result",
+                            "tool_use_id": tool_use.id,
+                            "content": result if isinstance(result, str) else json.dumps(result, default=str)
+                        })
+                messages.append({"role": "assistant", "content": response.content})
+                messages.append({"role": "user", "content": tool_results})
+            else:
+                logger.warning("Stopped after {} rounds of tool calls", MAX_TOOL_ROUNDS)
             
             return "\n".join(final_text)
         except Exception as e:
-            logger.error(f"Error processing query: {str(e)}")
+            logger.error("Error processing query: {}", e)
             return f"Error processing query: {str(e)}"
     
     def _print_help(self):
@@ -414,7 +1099,8 @@ class SQLiteMCPClient:
         
         while True:
             try:
-                query = input("\nQuery: ").strip()
+                # Read input off the event loop so background tasks keep running
+                query = (await ainput("\nQuery: ")).strip()
                 
                 if query.lower() == 'quit':
                     break
@@ -441,15 +1127,25 @@ class SQLiteMCPClient:
     
     async def cleanup(self):
         """Clean up resources."""
+        if self._tools_changed:
+            # The cached tool lists are stale, so make the next connect list them again
+            invalidate_tools_cache(self._tools_cache_key)
+            if self._tools_cache_file is not None:
+                self._tools_cache_file.unlink(missing_ok=True)
+            self._tools_changed = False
+        
         try:
-            # Close the exit stack which will handle all resources
-            try:
-                await self.exit_stack.aclose()
-                logger.info("Resources cleaned up")
-            except Exception as e:
-                logger.error(f"Error during exit stack cleanup: {str(e)}")
+            await self._stop_insight_writer()
+            
+            # Hand the session back to the pool, which closes it once it is idle
+            if self._server_params is not None:
+                SESSION_POOL.release(self._server_params, self._handle_server_message)
+                self._server_params = None
+            self.session = None
+            self._schema = _SchemaCache()
+            logger.info("Resources cleaned up")
         except Exception as e:
-            logger.error(f"Error during cleanup: {str(e)}")
+            logger.error("Error during cleanup: {}", e)
     
     async def call_with_timeout(self, coro, timeout=TIMEOUT_SECONDS):
         """Execute a coroutine with a timeout.
@@ -465,9 +1161,10 @@ class SQLiteMCPClient:
             TimeoutError: If the operation times out
         """
         try:
-            return await asyncio.wait_for(coro, timeout=timeout)
+            async with asyncio.timeout(timeout):
+                return await coro
         except asyncio.TimeoutError:
-            logger.error(f"Operation timed out after {timeout} seconds")
+            logger.error("Operation timed out after {} seconds", timeout)
             raise TimeoutError(f"Operation timed out after {timeout} seconds")
     
     async def execute_with_cancellation_handling(self, coro):
@@ -510,29 +1207,48 @@ class SQLiteMCPClient:
             else:
                 content = response
             
-            # Try to parse as JSON
+            if not isinstance(content, (str, bytes, bytearray)):
+                return content
+            
+            # Parse as JSON in a single C pass
             try:
-                return json.loads(content)
-            except (json.JSONDecodeError, TypeError):
-                # Try to parse as Python literal
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
+                pass
+            
+            # Only Python reprs of lists and dicts (as sent by mcp-server-sqlite)
+            # pay for a literal_eval; any other text is returned as is
+            if isinstance(content, str) and content.startswith(("{'", "[{'", "['")):
                 try:
-                    import ast
                     return ast.literal_eval(content)
                 except (SyntaxError, ValueError):
-                    # Return as is if not parseable
-                    return content
+                    pass
+            return content
         except Exception as e:
-            logger.error(f"Error parsing response: {str(e)}")
+            logger.error("Error parsing response: {}", e)
             return None
 
+    def _get_tool_slots(self) -> asyncio.Semaphore:
+        """Return the semaphore bounding this client's tool calls on the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._tool_slots_loop is not loop:
+            self._tool_slots = asyncio.Semaphore(MAX_CONCURRENT_TOOL_CALLS)
+            self._tool_slots_loop = loop
+        return self._tool_slots
+    
     async def call_tool_with_retry(self, tool_name, args, max_retries=RETRY_ATTEMPTS, retry_delay=RETRY_DELAY):
         """Call a tool with retry logic.
         
+        At most MAX_CONCURRENT_TOOL_CALLS calls per client run at once. Failed
+        attempts are retried with full-jitter exponential backoff that grows
+        from 1 ms on the first retry to retry_delay on the last, so brief
+        contention clears quickly while a restarting server still gets time.
+        
         Args:
             tool_name: Name of the tool to call
             args: Arguments for the tool
             max_retries: Maximum number of retries
-            retry_delay: Delay between retries in seconds
+            retry_delay: Upper bound on the delay between retries in seconds
             
         Returns:
             The result of the tool call
@@ -548,36 +1264,43 @@ class SQLiteMCPClient:
         
         timeout = tool_timeouts.get(tool_name, tool_timeouts["default"])
         
+        # Per-retry growth that takes the backoff from 1 ms to the cap
+        cap_ms = retry_delay * 1000
+        growth = cap_ms ** (1 / max(max_retries - 1, 1))
+        
         while retries <= max_retries:
             try:
-                result = await self.call_with_timeout(
-                    self.session.call_tool(tool_name, args),
-                    timeout=timeout
-                )
+                # The slot is held only for the call, not while backing off
+                async with self._get_tool_slots():
+                    result = await self.call_with_timeout(
+                        self.session.call_tool(tool_name, args),
+                        timeout=timeout
+                    )
                 return self.parse_response(result)
             except Exception as e:
                 last_error = e
                 retries += 1
                 if retries <= max_retries:
-                    logger.warning(f"Tool call failed, retrying ({retries}/{max_retries}): {str(e)}")
-                    await asyncio.sleep(retry_delay)
+                    logger.warning("Tool call failed, retrying ({}/{}): {}", retries, max_retries, e)
+                    # Full-jitter exponential backoff, up to 1 ms before the first retry
+                    delay_ms = min(cap_ms, growth ** (retries - 1))
+                    await asyncio.sleep(self._rng.uniform(0, delay_ms) / 1000)
                 else:
-                    logger.error(f"Tool call failed after {max_retries} retries: {str(e)}")
+                    logger.error("Tool call failed after {} retries: {}", max_retries, e)
                     raise last_error
 
 
 async def main():
     """Main entry point."""
-    if len(sys.argv) < 2:
-        print("Usage: python -m sqlite_client.src.client_sqlite <server_path> [db_path]")
-        sys.exit(1)
-    
-    server_path = sys.argv[1]
-    db_path = sys.argv[2] if len(sys.argv) > 2 else None
+    parser = argparse.ArgumentParser(description="Chat with a SQLite MCP server")
+    parser.add_argument("server_path", help="Server script, command, or Streamable HTTP URL")
+    parser.add_argument("db_path", nargs="?", help="Path to the SQLite database file")
+    parser.add_argument("--transport", choices=["auto", "stdio", "http"], default=TRANSPORT)
+    cli_args = parser.parse_args()
     
     client = SQLiteMCPClient()
     try:
-        await client.connect_to_server(server_path, db_path)
+        await client.connect_to_server(cli_args.server_path, cli_args.db_path, cli_args.transport)
         await client.chat_loop()
     except KeyboardInterrupt:
         print("\nShutting down gracefully...")
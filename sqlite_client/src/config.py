@@ -2,24 +2,55 @@
 Configuration settings for the SQLite MCP Client.
 """
 import os
+from typing import Final, List, Optional
+
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+_env = os.environ
+
+
+def _int(name: str, default: str) -> int:
+    """Read an integer setting from the environment."""
+    return int(_env.get(name, default))
+
+
 # Claude API settings
-CLAUDE_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-CLAUDE_MODEL = os.getenv("CLAUDE_MODEL", "claude-3-sonnet-20240229")
-MAX_TOKENS = int(os.getenv("MAX_TOKENS", "1000"))
+CLAUDE_API_KEY: Final[Optional[str]] = _env.get("ANTHROPIC_API_KEY")
+CLAUDE_MODEL: Final[str] = _env.get("CLAUDE_MODEL", "claude-3-sonnet-20240229")
+MAX_TOKENS: Final[int] = _int("MAX_TOKENS", "1000")
 
 # SQLite MCP Server settings
-DEFAULT_SERVER_PATH = os.getenv("SQLITE_SERVER_PATH", "mcp-server-sqlite")
-DEFAULT_DB_PATH = os.getenv("SQLITE_DB_PATH", "~/test.db")
+DEFAULT_SERVER_PATH: Final[str] = _env.get("SQLITE_SERVER_PATH", "mcp-server-sqlite")
+# "stdio", "http" (Streamable HTTP) or "auto" to use HTTP for http(s):// server paths
+TRANSPORT: Final[str] = _env.get("MCP_TRANSPORT", "auto")
+# Expanded once here; SQLite would otherwise create a literal "~" directory
+DEFAULT_DB_PATH: Final[str] = os.path.expanduser(_env.get("SQLITE_DB_PATH", "~/test.db"))
+# PRAGMAs applied after connecting, separated by semicolons (empty to disable)
+SQLITE_PRAGMAS: Final[List[str]] = [
+    pragma.strip()
+    for pragma in _env.get(
+        "SQLITE_PRAGMAS",
+        "journal_mode=WAL;synchronous=NORMAL;temp_store=MEMORY;cache_size=-64000"
+    ).split(";")
+    if pragma.strip()
+]
 
 # Client settings
-TIMEOUT_SECONDS = int(os.getenv("TIMEOUT_SECONDS", "90"))
-RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS", "5"))
-RETRY_DELAY = int(os.getenv("RETRY_DELAY", "2"))
+TOOLS_CACHE_DIR: Final[str] = _env.get("TOOLS_CACHE_DIR", "~/.cache")
+# Seconds a tool list is reused by later clients in the same process
+TOOLS_CACHE_TTL: Final[int] = _int("MCP_TOOLS_TTL", "300")
+# Seconds a tool list cached on disk is reused by later processes
+TOOLS_DISK_CACHE_TTL: Final[int] = _int("MCP_TOOLS_DISK_TTL", "3600")
+# Seconds an unused pooled server session stays open for reuse
+SESSION_IDLE_TIMEOUT: Final[int] = _int("SESSION_IDLE_TIMEOUT", "60")
+TIMEOUT_SECONDS: Final[int] = _int("TIMEOUT_SECONDS", "90")
+RETRY_ATTEMPTS: Final[int] = _int("RETRY_ATTEMPTS", "5")
+RETRY_DELAY: Final[int] = _int("RETRY_DELAY", "2")
+# Tool calls a client may have in flight at once; retries wait outside the limit
+MAX_CONCURRENT_TOOL_CALLS: Final[int] = _int("MAX_CONCURRENT_TOOL_CALLS", "8")
 
 # Logging settings
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO") 
\ No newline at end of file
+LOG_LEVEL: Final[str] = _env.get("LOG_LEVEL", "INFO")
@@ -4,9 +4,34 @@ Business Insight Generation for SQLite MCP Client.
 This module provides utilities for generating business insights
 from SQL query results and managing the insights memo.
 """
-from typing import Dict, List, Any, Optional
+import re
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Set, Tuple
 from loguru import logger
 
+# Aggregate functions used in a query, matched in a single scan
+_AGG_RE = re.compile(r'\b(COUNT|AVG|SUM|MIN|MAX)\b')
+_MEASURE_AGGS = frozenset(("AVG", "SUM", "MIN", "MAX"))
+
+# Clauses that end a GROUP BY list
+_GROUP_BY_END_RE = re.compile(r'\b(HAVING|ORDER\s+BY|LIMIT|WINDOW|UNION|INTERSECT|EXCEPT)\b')
+
+
+def _group_by_columns(query_upper: str) -> Set[str]:
+    """Parse the upper-cased GROUP BY list of a query into bare column names.
+    
+    Table qualifiers and identifier quotes are dropped; ordinals such as
+    ``GROUP BY 1`` are kept as-is for the caller to resolve.
+    """
+    clause = query_upper.split("GROUP BY", 1)[1]
+    clause = _GROUP_BY_END_RE.split(clause, 1)[0]
+    columns = set()
+    for term in clause.split(","):
+        term = term.strip().rstrip(";").strip()
+        if term:
+            columns.add(term.rsplit(".", 1)[-1].strip('`"[]'))
+    return columns
+
 
 def analyze_query_results(
     query: str,
@@ -15,6 +40,10 @@ def analyze_query_results(
 ) -> List[str]:
     """Analyze query results to generate potential business insights.
     
+    Results are memoized per (query, rows), so re-analyzing an unchanged
+    result set skips the analysis. Call clear_insight_cache() after schema
+    changes.
+    
     Args:
         query: The SQL query that generated the results
         results: List of result rows as dictionaries
@@ -23,6 +52,36 @@ def analyze_query_results(
     Returns:
         List of potential business insights
     """
+    try:
+        rows = tuple(tuple(row.items()) for row in results)
+        hash(rows)
+    except TypeError:
+        # Rows holding unhashable values can't be used as a cache key
+        return _analyze_query_results(query, results, table_name)
+    return list(_analyze_rows_cached(query, rows, table_name))
+
+
+def clear_insight_cache() -> None:
+    """Clear memoized analyze_query_results output."""
+    _analyze_rows_cached.cache_clear()
+
+
+@lru_cache(maxsize=128)
+def _analyze_rows_cached(
+    query: str,
+    rows: Tuple[Tuple[Tuple[str, Any], ...], ...],
+    table_name: Optional[str]
+) -> Tuple[str, ...]:
+    """Cached analysis of rows given as hashable tuples of (column, value) pairs."""
+    return tuple(_analyze_query_results(query, [dict(row) for row in rows], table_name))
+
+
+def _analyze_query_results(
+    query: str,
+    results: List[Dict[str, Any]],
+    table_name: Optional[str] = None
+) -> List[str]:
+    """Generate insights for query results without caching."""
     insights = []
     
     if not results:
@@ -32,41 +91,61 @@ def analyze_query_results(
     row_count = len(results)
     insights.append(f"Query returned {row_count} rows of data.")
     
+    query_upper = query.upper()
+    aggs_in_query = set(_AGG_RE.findall(query_upper))
+    
     # Analyze based on query type
-    if "COUNT" in query.upper() and row_count == 1:
+    if "COUNT" in aggs_in_query and row_count == 1:
         # Count query
         for key, value in results[0].items():
             if "COUNT" in key.upper():
                 insights.append(f"Total count: {value}")
     
-    elif "AVG" in query.upper() or "SUM" in query.upper() or "MIN" in query.upper() or "MAX" in query.upper():
-        # Aggregate query
-        for row in results:
-            for key, value in row.items():
-                if any(agg in key.upper() for agg in ["AVG", "SUM", "MIN", "MAX"]):
-                    insights.append(f"{key}: {value}")
-    
-    elif "GROUP BY" in query.upper():
+    elif "GROUP BY" in query_upper:
         # Group by query - look for patterns
         if row_count > 1:
             # Find the grouped column and the measure columns
             grouped_col = None
             measure_cols = []
+            group_cols = _group_by_columns(query_upper)
             
-            for key in results[0].keys():
-                if key in query.upper().split("GROUP BY")[1]:
+            for position, key in enumerate(results[0], 1):
+                if key.upper() in group_cols or str(position) in group_cols:
                     grouped_col = key
                 else:
                     measure_cols.append(key)
             
             if grouped_col and measure_cols:
-                # Find the top value
-                top_row = max(results, key=lambda x: float(x[measure_cols[0]]) if isinstance(x[measure_cols[0]], (int, float)) or str(x[measure_cols[0]]).isdigit() else 0)
-                insights.append(f"Top {grouped_col}: {top_row[grouped_col]} with {measure_cols[0]} of {top_row[measure_cols[0]]}")
+                # Aggregates were computed by SQLite in the same scan, so just
+                # report them per group instead of recomputing anything here
+                for row in results:
+                    measures = ", ".join(f"{col} {row[col]}" for col in measure_cols)
+                    insights.append(f"{grouped_col} {row[grouped_col]}: {measures}")
                 
-                # Find the bottom value
-                bottom_row = min(results, key=lambda x: float(x[measure_cols[0]]) if isinstance(x[measure_cols[0]], (int, float)) or str(x[measure_cols[0]]).isdigit() else float('inf'))
-                insights.append(f"Bottom {grouped_col}: {bottom_row[grouped_col]} with {measure_cols[0]} of {bottom_row[measure_cols[0]]}")
+                # Find the top and bottom values in one pass, coercing each
+                # value once and skipping rows without a numeric measure
+                col = measure_cols[0]
+                top_row = top_value = bottom_row = bottom_value = None
+                for row in results:
+                    try:
+                        value = float(row[col])
+                    except (TypeError, ValueError):
+                        continue
+                    if top_value is None or value > top_value:
+                        top_value, top_row = value, row
+                    if bottom_value is None or value < bottom_value:
+                        bottom_value, bottom_row = value, row
+                
+                if top_row is not None:
+                    insights.append(f"Top {grouped_col}: {top_row[grouped_col]} with {col} of {top_row[col]}")
+                    insights.append(f"Bottom {grouped_col}: {bottom_row[grouped_col]} with {col} of {bottom_row[col]}")
+    
+    elif aggs_in_query & _MEASURE_AGGS:
+        # Aggregate query; every row has the same columns, so classify them once
+        agg_keys = [key for key in results[0] if any(agg in key.upper() for agg in _MEASURE_AGGS)]
+        for row in results:
+            for key in agg_keys:
+                insights.append(f"{key}: {row[key]}")
     
     return insights
 
@@ -113,38 +192,30 @@ def generate_insight_from_schema(
     Returns:
         Insight text about the schema
     """
-    column_types = {}
-    for col in columns:
-        col_type = col.get("type", "").upper()
-        if col_type not in column_types:
-            column_types[col_type] = []
-        column_types[col_type].append(col.get("name"))
+    # Read each column's name and type once, then classify in a single pass
+    names = [col.get("name", "") for col in columns]
+    types_upper = [col.get("type", "").upper() for col in columns]
+    
+    column_types: Dict[str, List[str]] = {}
+    potential_keys = []
+    date_columns = []
+    for name, col_type in zip(names, types_upper):
+        column_types.setdefault(col_type, []).append(name)
+        name_lower = name.lower()
+        if "id" in name_lower or name_lower.endswith("_id") or "key" in name_lower:
+            potential_keys.append(name_lower)
+        if ("date" in name_lower or "time" in name_lower or
+            "DATE" in col_type or "TIME" in col_type):
+            date_columns.append(name_lower)
     
     insights = [f"Table '{table_name}' has {len(columns)} columns:"]
     
     for col_type, cols in column_types.items():
         insights.append(f"- {len(cols)} {col_type} columns: {', '.join(cols)}")
     
-    # Identify potential key columns
-    potential_keys = []
-    for col in columns:
-        col_name = col.get("name", "").lower()
-        col_type = col.get("type", "").upper()
-        if "id" in col_name or col_name.endswith("_id") or "key" in col_name:
-            potential_keys.append(col_name)
-    
     if potential_keys:
         insights.append(f"- Potential key columns: {', '.join(potential_keys)}")
     
-    # Identify potential date columns
-    date_columns = []
-    for col in columns:
-        col_name = col.get("name", "").lower()
-        col_type = col.get("type", "").upper()
-        if ("date" in col_name or "time" in col_name or 
-            "DATE" in col_type or "TIME" in col_type):
-            date_columns.append(col_name)
-    
     if date_columns:
         insights.append(f"- Date/time columns: {', '.join(date_columns)}")
     
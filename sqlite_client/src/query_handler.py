@@ -4,37 +4,160 @@ Query Handler for SQLite MCP Client.
 This module provides utilities for SQL query validation,
 formatting, and processing.
 """
+import math
 import re
-from typing import Dict, List, Any, Tuple, Optional
+import sqlite3
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Any, Tuple, Optional, Union
 from loguru import logger
 
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
 
-def validate_query(query: str) -> Tuple[bool, Optional[str]]:
+# Basic SQL injection patterns rejected by validate_query(). Queries are
+# upper-cased once before matching, so the patterns are case-sensitive
+_DANGEROUS_PATTERNS = (
+    r';\s*DROP\s+TABLE',
+    r';\s*DELETE\s+FROM',
+    r';\s*UPDATE\s+.*\s*SET',
+    r';\s*INSERT\s+INTO',
+    r'--',
+    r'/\*.*\*/'
+)
+# All patterns in one alternation, so the query is scanned once; the group
+# that matched identifies the pattern
+_DANGEROUS_RE = re.compile("|".join(f"({pattern})" for pattern in _DANGEROUS_PATTERNS))
+
+
+def _compile_dangerous_hyperscan():
+    """Compile the dangerous patterns into a Hyperscan database, if available."""
+    if hyperscan is None:
+        return None
+    try:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=[pattern.encode() for pattern in _DANGEROUS_PATTERNS],
+            ids=list(range(len(_DANGEROUS_PATTERNS))),
+            elements=len(_DANGEROUS_PATTERNS),
+            # Report where matches start, to pick the leftmost one like re does
+            flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(_DANGEROUS_PATTERNS),
+        )
+        return database
+    except hyperscan.HyperscanError as e:
+        logger.warning("Hyperscan unavailable, using regex validation: {}", e)
+        return None
+
+
+# DFA scanner for the dangerous patterns; None falls back to _DANGEROUS_RE
+_DANGEROUS_HS = _compile_dangerous_hyperscan()
+
+
+def _find_dangerous_pattern(query_upper: str) -> Optional[str]:
+    """Return the first dangerous pattern found in an upper-cased query, if any.
+    
+    Both scanners report the pattern of the leftmost match, preferring the
+    earlier pattern when several start at the same position.
+    """
+    # Every pattern needs one of these, and most queries contain none
+    if ";" not in query_upper and "--" not in query_upper and "/*" not in query_upper:
+        return None
+    
+    if _DANGEROUS_HS is not None:
+        # Hyperscan reports matches in order of where they end, so keep the
+        # one that starts first rather than the first reported
+        matched = []
+        
+        def on_match(pattern_id, start, end, flags, context):
+            matched.append((start, pattern_id))
+        
+        _DANGEROUS_HS.scan(query_upper.encode(), match_event_handler=on_match)
+        return _DANGEROUS_PATTERNS[min(matched)[1]] if matched else None
+    
+    match = _DANGEROUS_RE.search(query_upper)
+    return _DANGEROUS_PATTERNS[match.lastindex - 1] if match else None
+
+
+# SQL comments, stripped to spot statements that contain nothing else
+_SQL_COMMENT_RE = re.compile(r'--[^\n]*|/\*.*?(\*/|$)', re.DOTALL)
+
+# Clauses each query type must include, matched against the upper-cased query
+_FROM_RE = re.compile(r'FROM\s+\w+')
+_INTO_RE = re.compile(r'INTO\s+\w+')
+_SET_RE = re.compile(r'SET\s+\w+\s*=')
+_CREATE_TABLE_RE = re.compile(r'TABLE\s+\w+\s*\(')
+
+# Separator between column definitions in generated CREATE TABLE queries
+_COLUMN_DEF_SEP = ",\n  "
+
+# Leading keyword of a query and the query type it maps to; CREATE is only
+# a query type when followed by TABLE
+_KEYWORD_RE = re.compile(r'[A-Z]+')
+_QUERY_TYPES = {
+    "SELECT": "SELECT",
+    "INSERT": "INSERT",
+    "UPDATE": "UPDATE",
+    "DELETE": "DELETE",
+    "ALTER": "ALTER",
+    "DROP": "DROP",
+}
+
+
+@dataclass(frozen=True)
+class PreparedQuery:
+    """A query template with values bound to ? placeholders.
+    
+    The values are kept out of the SQL text until the query is sent, so
+    validate_query() only checks the template. The template itself is
+    validated like any other query, since callers can build it from
+    arbitrary text.
+    """
+    sql: str
+    params: Tuple[Any, ...] = ()
+    
+    def __post_init__(self):
+        # Accept any sequence of values but store a tuple so instances stay hashable
+        object.__setattr__(self, "params", tuple(self.params))
+    
+    def to_sql(self) -> str:
+        """Render the query with its values inlined, for tools that take plain SQL."""
+        return bind_query_params(self.sql, list(self.params))
+
+
+def validate_query(query: Union[str, PreparedQuery]) -> Tuple[bool, Optional[str]]:
     """Validate a SQL query for basic syntax and security issues.
     
+    Results are memoized per query text, since the same queries recur.
+    Prepared queries are checked by their template, so every set of bound
+    values shares one cached result.
+    
     Args:
         query: SQL query to validate
         
     Returns:
         Tuple of (is_valid, error_message)
     """
+    if isinstance(query, PreparedQuery):
+        query = query.sql
+    return _validate_query_cached(query)
+
+
+@lru_cache(maxsize=1024)
+def _validate_query_cached(query: str) -> Tuple[bool, Optional[str]]:
+    """Cached validate_query() for SQL text."""
     # Check for empty query
     if not query or not query.strip():
         return False, "Query cannot be empty"
     
+    # Upper-case once so every pattern can match case-sensitively
+    query_upper = query.upper()
+    
     # Check for basic SQL injection patterns
-    dangerous_patterns = [
-        r';\s*DROP\s+TABLE',
-        r';\s*DELETE\s+FROM',
-        r';\s*UPDATE\s+.*\s*SET',
-        r';\s*INSERT\s+INTO',
-        r'--',
-        r'/\*.*\*/'
-    ]
-    
-    for pattern in dangerous_patterns:
-        if re.search(pattern, query, re.IGNORECASE):
-            return False, f"Query contains potentially dangerous pattern: {pattern}"
+    pattern = _find_dangerous_pattern(query_upper)
+    if pattern:
+        return False, f"Query contains potentially dangerous pattern: {pattern}"
     
     # Determine query type
     query_type = get_query_type(query)
@@ -42,23 +165,23 @@ def validate_query(query: str) -> Tuple[bool, Optional[str]]:
     # Validate based on query type
     if query_type == "SELECT":
         # Basic validation for SELECT queries
-        if not re.search(r'FROM\s+\w+', query, re.IGNORECASE):
+        if not _FROM_RE.search(query_upper):
             return False, "SELECT query must include FROM clause"
     elif query_type == "INSERT":
         # Basic validation for INSERT queries
-        if not re.search(r'INTO\s+\w+', query, re.IGNORECASE):
+        if not _INTO_RE.search(query_upper):
             return False, "INSERT query must include INTO clause"
     elif query_type == "UPDATE":
         # Basic validation for UPDATE queries
-        if not re.search(r'SET\s+\w+\s*=', query, re.IGNORECASE):
+        if not _SET_RE.search(query_upper):
             return False, "UPDATE query must include SET clause"
     elif query_type == "DELETE":
         # Basic validation for DELETE queries
-        if not re.search(r'FROM\s+\w+', query, re.IGNORECASE):
+        if not _FROM_RE.search(query_upper):
             return False, "DELETE query must include FROM clause"
     elif query_type == "CREATE":
         # Basic validation for CREATE TABLE queries
-        if not re.search(r'TABLE\s+\w+\s*\(', query, re.IGNORECASE):
+        if not _CREATE_TABLE_RE.search(query_upper):
             return False, "CREATE TABLE query must include table name and column definitions"
     else:
         return False, f"Unsupported query type: {query_type}"
@@ -66,33 +189,153 @@ def validate_query(query: str) -> Tuple[bool, Optional[str]]:
     return True, None
 
 
+@lru_cache(maxsize=1024)
 def get_query_type(query: str) -> str:
     """Determine the type of SQL query.
     
+    Results are memoized per query text like validate_query().
+    
     Args:
         query: SQL query
         
     Returns:
         Query type (SELECT, INSERT, UPDATE, DELETE, CREATE, etc.)
     """
-    query = query.strip().upper()
-    
-    if query.startswith("SELECT"):
-        return "SELECT"
-    elif query.startswith("INSERT"):
-        return "INSERT"
-    elif query.startswith("UPDATE"):
-        return "UPDATE"
-    elif query.startswith("DELETE"):
-        return "DELETE"
-    elif query.startswith("CREATE TABLE"):
-        return "CREATE"
-    elif query.startswith("ALTER"):
-        return "ALTER"
-    elif query.startswith("DROP"):
-        return "DROP"
-    else:
-        return "UNKNOWN"
+    # Only the first keyword matters, so don't upper-case the whole query
+    head = query.lstrip()[:12].upper()
+    match = _KEYWORD_RE.match(head)
+    keyword = match.group() if match else ""
+    
+    if keyword == "CREATE":
+        return "CREATE" if head.startswith("CREATE TABLE") else "UNKNOWN"
+    return _QUERY_TYPES.get(keyword, "UNKNOWN")
+
+
+def is_comment_only(sql: str) -> bool:
+    """Check whether SQL text holds nothing but comments and whitespace.
+    
+    Args:
+        sql: SQL text
+        
+    Returns:
+        True if there is no statement to run
+    """
+    return not _SQL_COMMENT_RE.sub("", sql).strip()
+
+
+def split_sql_statements(script: str) -> List[str]:
+    """Split a SQL script into individual statements.
+    
+    Uses SQLite's own tokenizer to find statement boundaries, so semicolons
+    inside string literals or comments do not split a statement. Pieces
+    holding only comments, such as a comment after the last semicolon, are
+    dropped.
+    
+    Args:
+        script: One or more SQL statements separated by semicolons
+        
+    Returns:
+        List of statements without their trailing semicolons
+    """
+    statements = []
+    current = ""
+    for part in script.split(";"):
+        current += part + ";"
+        if sqlite3.complete_statement(current):
+            statement = current.strip().rstrip(";").strip()
+            if not is_comment_only(statement):
+                statements.append(statement)
+            current = ""
+    
+    remainder = current.rstrip(";").strip()
+    if not is_comment_only(remainder):
+        statements.append(remainder)
+    return statements
+
+
+def quote_sql_literal(value: Any) -> str:
+    """Render a Python value as a SQLite literal.
+    
+    Int and float subclasses such as IntEnum are rendered by their numeric
+    value.
+    
+    Args:
+        value: None, bool, int, float, str or bytes value
+        
+    Returns:
+        SQL literal text
+        
+    Raises:
+        ValueError: If value is an infinite or NaN float, which SQL has no
+            literal for
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(int(value))
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError(f"Cannot render non-finite float {value!r} as a SQL literal")
+        return repr(float(value))
+    if isinstance(value, bytes):
+        return f"X'{value.hex()}'"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def bind_query_params(query: str, params: List[Any]) -> str:
+    """Substitute ? placeholders in a query with quoted literal values.
+    
+    Placeholders inside quoted strings or identifiers and inside comments
+    are left untouched.
+    
+    Args:
+        query: SQL query with ? placeholders
+        params: Values for the placeholders, in order
+        
+    Returns:
+        SQL query with the values inlined
+        
+    Raises:
+        ValueError: If the number of placeholders and values differ
+    """
+    parts = []
+    values = iter(params)
+    used = 0
+    # Closing delimiter of the quoted string, identifier or comment being copied
+    quote = None
+    length = len(query)
+    i = 0
+    while i < length:
+        char = query[i]
+        i += 1
+        if quote:
+            if query.startswith(quote, i - 1):
+                parts.append(quote)
+                i += len(quote) - 1
+                quote = None
+                continue
+        elif char in ("'", '"'):
+            quote = char
+        elif char == "-" and query.startswith("-", i):
+            quote = "\n"
+        elif char == "/" and query.startswith("*", i):
+            quote = "*/"
+            parts.append("/*")
+            i += 1
+            continue
+        elif char == "?":
+            try:
+                char = quote_sql_literal(next(values))
+            except StopIteration:
+                raise ValueError("Not enough parameters for query placeholders") from None
+            used += 1
+        parts.append(char)
+    
+    if used != len(params):
+        raise ValueError(f"Query has {used} placeholders but {len(params)} parameters were given")
+    return "".join(parts)
 
 
 def format_query_results(results: List[Dict[str, Any]], max_width: int = 80) -> str:
@@ -105,46 +348,75 @@ def format_query_results(results: List[Dict[str, Any]], max_width: int = 80) ->
     Returns:
         Formatted string representation of results
     """
+    return "\n".join(iter_formatted_rows(results, max_width))
+
+
+def iter_formatted_rows(results: List[Dict[str, Any]], max_width: int = 80) -> Iterator[str]:
+    """Format query results for display one line at a time.
+    
+    Yields the same lines as format_query_results() without building the
+    whole output, for writing large result sets to a file or socket. Cells
+    are still stringified up front to size the columns.
+    
+    Args:
+        results: List of result rows as dictionaries
+        max_width: Maximum width for formatting
+        
+    Yields:
+        Header, separator, then one line per row
+    """
     if not results:
-        return "No results found."
+        yield "No results found."
+        return
     
     # Get column names
     columns = list(results[0].keys())
     
+    # Stringify every cell once, column by column, for both the width and
+    # the output pass; map() calls str from C instead of looking it up per cell
+    grid = [list(map(str, [row.get(col, "") for row in results])) for col in columns]
+    
     # Calculate column widths
-    col_widths = {col: len(col) for col in columns}
-    for row in results:
-        for col in columns:
-            col_widths[col] = max(col_widths[col], len(str(row.get(col, ""))))
+    widths = tuple(max(len(col), max(map(len, cells))) for col, cells in zip(columns, grid))
+    
+    header, separator, format_row = _row_formatter(tuple(columns), widths, max_width)
+    yield header
+    yield separator
+    
+    # map() feeds the row formatter the columns in parallel, one row at a time
+    yield from map(format_row, *grid)
+
+
+@lru_cache(maxsize=128)
+def _row_formatter(
+    columns: Tuple[str, ...],
+    widths: Tuple[int, ...],
+    max_width: int
+) -> Tuple[str, str, Callable[..., str]]:
+    """Build the header, separator and row formatter for a result layout.
     
+    Column widths are scaled down to fit max_width here. The row formatter
+    is a str.format template with the final widths baked in, so padding,
+    truncating and joining a whole row is a single C call. Layouts are
+    memoized, since repeated queries produce the same one.
+    """
     # Adjust column widths to fit max_width
-    total_width = sum(col_widths.values()) + (3 * len(columns)) - 1
+    total_width = sum(widths) + (3 * len(columns)) - 1
     if total_width > max_width:
         # Scale down column widths proportionally
         scale_factor = max_width / total_width
-        for col in col_widths:
-            col_widths[col] = max(10, int(col_widths[col] * scale_factor))
-    
-    # Create header
-    header = " | ".join(col.ljust(col_widths[col]) for col in columns)
-    separator = "-" * len(header)
-    
-    # Create rows
-    rows = []
-    for row in results:
-        formatted_row = " | ".join(
-            str(row.get(col, "")).ljust(col_widths[col])[:col_widths[col]] 
-            for col in columns
-        )
-        rows.append(formatted_row)
+        widths = tuple(max(10, int(width * scale_factor)) for width in widths)
     
-    # Combine all parts
-    return f"{header}\n{separator}\n" + "\n".join(rows)
+    header = " | ".join(col.ljust(width) for col, width in zip(columns, widths))
+    row_template = " | ".join(f"{{:<{width}.{width}}}" for width in widths)
+    return header, "-" * len(header), row_template.format
 
 
 def generate_sample_query(table_name: str, columns: List[Dict[str, str]]) -> str:
     """Generate a sample SELECT query for a table.
     
+    Queries are memoized per table name and column names.
+    
     Args:
         table_name: Name of the table
         columns: List of column definitions
@@ -152,13 +424,34 @@ def generate_sample_query(table_name: str, columns: List[Dict[str, str]]) -> str
     Returns:
         Sample SELECT query
     """
-    column_names = [col["name"] for col in columns]
-    return f"SELECT {', '.join(column_names)} FROM {table_name} LIMIT 5;"
+    return _sample_query_cached(table_name, tuple(col["name"] for col in columns), "5")
+
+
+def prepare_sample_query(table_name: str, columns: List[Dict[str, str]], limit: int = 5) -> PreparedQuery:
+    """Generate a sample SELECT query for a table with the row limit as a parameter.
+    
+    Args:
+        table_name: Name of the table
+        columns: List of column definitions
+        limit: Maximum number of rows to return
+        
+    Returns:
+        Prepared SELECT query
+    """
+    return PreparedQuery(_sample_query_cached(table_name, tuple(col["name"] for col in columns), "?"), (limit,))
+
+
+@lru_cache(maxsize=256)
+def _sample_query_cached(table_name: str, column_names: Tuple[str, ...], limit: str) -> str:
+    """Cached sample query text keyed by a tuple of column names."""
+    return f"SELECT {', '.join(column_names)} FROM {table_name} LIMIT {limit};"
 
 
 def generate_create_table_query(table_name: str, columns: List[Dict[str, str]]) -> str:
     """Generate a CREATE TABLE query.
     
+    Queries are memoized per table name and column (name, type) pairs.
+    
     Args:
         table_name: Name of the table
         columns: List of column definitions with name and type
@@ -166,8 +459,11 @@ def generate_create_table_query(table_name: str, columns: List[Dict[str, str]])
     Returns:
         CREATE TABLE SQL statement
     """
-    column_defs = []
-    for col in columns:
-        column_defs.append(f"{col['name']} {col['type']}")
-    
-    return f"CREATE TABLE {table_name} (\n  {',\n  '.join(column_defs)}\n);" 
\ No newline at end of file
+    return _create_table_query_cached(table_name, tuple((col["name"], col["type"]) for col in columns))
+
+
+@lru_cache(maxsize=256)
+def _create_table_query_cached(table_name: str, columns: Tuple[Tuple[str, str], ...]) -> str:
+    """Cached generate_create_table_query() keyed by (name, type) pairs."""
+    body = _COLUMN_DEF_SEP.join(f"{name} {col_type}" for name, col_type in columns)
+    return f"CREATE TABLE {table_name} (\n  {body}\n);"
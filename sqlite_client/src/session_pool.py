@@ -0,0 +1,225 @@
+"""
+Pool of live MCP sessions shared across clients.
+
+Starting the server subprocess and running the initialize handshake
+dominates connect time, so clients connecting to the same server (same
+command, args and env, or same URL) share one ClientSession. Sessions are
+reference counted and closed once they have been idle for
+SESSION_IDLE_TIMEOUT seconds. Streamable HTTP sessions all go through one
+keep-alive httpx client.
+"""
+import asyncio
+import json
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+import httpx
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamable_http_client
+from loguru import logger
+
+from .config import SESSION_IDLE_TIMEOUT
+
+MessageHandler = Callable[[object], Awaitable[None]]
+
+# A stdio server to launch, or the URL of a Streamable HTTP server
+ServerParams = Union[StdioServerParameters, str]
+
+
+def _server_name(params: ServerParams) -> str:
+    """Describe a server for log messages."""
+    return params if isinstance(params, str) else params.command
+
+
+async def close_stale(closing: Awaitable[None], what: str):
+    """Wait for a client left over from a finished event loop to close.
+
+    Its connections were opened on the old loop, so closing them may fail;
+    whatever is still open is then left to the garbage collector.
+
+    Args:
+        closing: The client's close coroutine
+        what: Description of the client for log messages
+    """
+    try:
+        await closing
+    except Exception as e:
+        logger.debug("Could not close {} of a finished event loop: {}", what, e)
+
+
+class _PooledSession:
+    """One live server connection and the clients using it."""
+
+    def __init__(self):
+        self.session: Optional[ClientSession] = None
+        self.refcount = 0
+        self.handlers: List[MessageHandler] = []
+        self.loop = asyncio.get_running_loop()
+        self.ready = asyncio.Event()
+        self.closing = asyncio.Event()
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+        self.idle_timer: Optional[asyncio.TimerHandle] = None
+        # Set once the first client has run its per-connection setup
+        self.setup_claimed = False
+
+    async def dispatch(self, message):
+        """Forward a server message to every client using this session."""
+        for handler in list(self.handlers):
+            await handler(message)
+
+
+class StdioSessionPool:
+    """Share one initialized ClientSession per stdio server."""
+
+    def __init__(self, idle_timeout: float = SESSION_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._entries: Dict[str, _PooledSession] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    @staticmethod
+    def key(params: ServerParams) -> str:
+        """Serialize the server parameters into a pool key."""
+        if isinstance(params, str):
+            return json.dumps(params)
+        return json.dumps([params.command, list(params.args), params.env], sort_keys=True)
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Return the keep-alive HTTP client shared by every HTTP session."""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(30, read=300),
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            )
+        return self._http_client
+
+    async def acquire(self, params: ServerParams, message_handler: Optional[MessageHandler] = None) -> ClientSession:
+        """Return an initialized session for the server, starting it if needed.
+
+        Args:
+            params: Parameters of the stdio server, or the server URL
+            message_handler: Called with every message the server sends
+
+        Returns:
+            The shared ClientSession
+        """
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            # Connections of a finished loop can't be reused on this one
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+            stale, self._http_client = self._http_client, None
+            if stale is not None:
+                await close_stale(stale.aclose(), "HTTP client")
+        key = self.key(params)
+        async with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.task.done() or entry.loop is not loop):
+                # The connection died or belongs to an event loop that has finished
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                entry = _PooledSession()
+                entry.task = asyncio.create_task(self._run(key, entry, params))
+                self._entries[key] = entry
+                await entry.ready.wait()
+                if entry.error is not None:
+                    self._entries.pop(key, None)
+                    raise entry.error
+            else:
+                logger.debug("Reusing pooled session for {}", _server_name(params))
+
+            if entry.idle_timer is not None:
+                entry.idle_timer.cancel()
+                entry.idle_timer = None
+            entry.refcount += 1
+            if message_handler is not None:
+                entry.handlers.append(message_handler)
+            return entry.session
+
+    def claim_setup(self, params: ServerParams) -> bool:
+        """Claim the one-time setup of the pooled session for a server.
+
+        Returns True only to the first caller for each connection, so setup
+        such as PRAGMAs runs once rather than for every client sharing it.
+
+        Args:
+            params: Parameters the session was acquired with
+
+        Returns:
+            Whether the caller should run the setup
+        """
+        entry = self._entries.get(self.key(params))
+        if entry is None or entry.setup_claimed:
+            return False
+        entry.setup_claimed = True
+        return True
+
+    def release(self, params: ServerParams, message_handler: Optional[MessageHandler] = None):
+        """Give back a session acquired with acquire().
+
+        The session is closed after it has been unused for idle_timeout seconds.
+
+        Args:
+            params: Parameters the session was acquired with
+            message_handler: The handler passed to acquire(), if any
+        """
+        entry = self._entries.get(self.key(params))
+        if entry is None:
+            return
+        if message_handler in entry.handlers:
+            entry.handlers.remove(message_handler)
+        entry.refcount -= 1
+        if entry.refcount <= 0:
+            entry.refcount = 0
+            entry.idle_timer = entry.loop.call_later(self.idle_timeout, entry.closing.set)
+
+    async def aclose(self):
+        """Close every pooled session now."""
+        entries = list(self._entries.values())
+        self._entries.clear()
+        for entry in entries:
+            if entry.idle_timer is not None:
+                entry.idle_timer.cancel()
+            entry.closing.set()
+        await asyncio.gather(*(entry.task for entry in entries), return_exceptions=True)
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    def _transport(self, params: ServerParams):
+        """Open the transport for a server."""
+        if isinstance(params, str):
+            return streamable_http_client(params, http_client=self._get_http_client())
+        return stdio_client(params)
+
+    async def _run(self, key: str, entry: _PooledSession, params: ServerParams):
+        """Own one connection for its whole lifetime.
+
+        The transports have to be entered and exited in the same task, so
+        every connection lives in its own task until it is asked to close.
+        """
+        try:
+            async with self._transport(params) as streams:
+                read, write = streams[0], streams[1]
+                async with ClientSession(read, write, message_handler=entry.dispatch) as session:
+                    await session.initialize()
+                    entry.session = session
+                    entry.ready.set()
+                    await entry.closing.wait()
+        except BaseException as e:
+            entry.error = e
+            if not isinstance(e, Exception):
+                raise
+            logger.error("Pooled session for {} failed: {}", _server_name(params), e)
+        finally:
+            entry.ready.set()
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            logger.debug("Closed pooled session for {}", _server_name(params))
+
+
+# Pool used by every SQLiteMCPClient in the process
+SESSION_POOL = StdioSessionPool()
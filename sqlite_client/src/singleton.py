@@ -0,0 +1,89 @@
+"""
+Process-wide shared SQLiteMCPClient.
+
+Scripts and test harnesses that run several scenarios in one process can
+share a single connected client instead of paying server startup and tool
+discovery for every scenario.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from loguru import logger
+
+from .client_sqlite import SQLiteMCPClient
+from .config import DEFAULT_SERVER_PATH
+from .session_pool import SESSION_POOL
+
+_client: Optional[SQLiteMCPClient] = None
+_lock: Optional[asyncio.Lock] = None
+
+
+def _get_lock() -> asyncio.Lock:
+    """Return the lock guarding the shared client, creating it on first use.
+
+    An asyncio.Lock binds to the loop it is first contended on, so
+    close_client() drops it and each run_with_client() loop gets a fresh one.
+    """
+    global _lock
+    if _lock is None:
+        _lock = asyncio.Lock()
+    return _lock
+
+
+async def get_client(server_script_path: str = DEFAULT_SERVER_PATH, db_path: str = None) -> SQLiteMCPClient:
+    """Return the shared client, connecting it on first use.
+
+    The connection arguments only take effect on the first call; later
+    calls return the already connected client.
+
+    Args:
+        server_script_path: Path to the server script or command
+        db_path: Path to the SQLite database file
+
+    Returns:
+        The connected SQLiteMCPClient
+    """
+    global _client
+    async with _get_lock():
+        if _client is None:
+            client = SQLiteMCPClient()
+            await client.connect_to_server(server_script_path, db_path)
+            _client = client
+        return _client
+
+
+async def close_client():
+    """Clean up the shared client if one was connected."""
+    global _client, _lock
+    async with _get_lock():
+        if _client is None:
+            return
+        start_time = time.time()
+        await _client.cleanup()
+        _client = None
+        _lock = None
+        logger.debug("Shared client closed in {:.2f} seconds", time.time() - start_time)
+
+
+def run_with_client(main: Callable[[], Awaitable[Any]]) -> Any:
+    """Run ``main()`` on a new event loop and close the shared client before the loop exits.
+
+    The stdio transport is bound to the loop that opened it, so cleanup has to
+    happen on that same loop rather than from an ``atexit`` hook. Pooled server
+    sessions are closed right away instead of waiting out their idle timeout.
+
+    Args:
+        main: Coroutine function to run
+
+    Returns:
+        Whatever ``main()`` returns
+    """
+    async def _runner():
+        try:
+            return await main()
+        finally:
+            await close_client()
+            await SESSION_POOL.aclose()
+
+    return asyncio.run(_runner())
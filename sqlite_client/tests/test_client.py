@@ -39,6 +39,8 @@ async def test_query_validation():
     assert is_valid
     assert error is None
     assert get_query_type(valid_insert) == "INSERT"
+    assert get_query_type("  create table t (id INTEGER)") == "CREATE"
+    assert get_query_type("CREATE INDEX idx ON t (id)") == "UNKNOWN"
     
     # Test invalid queries
     invalid_query = "SELECT * FROM"
@@ -50,6 +52,10 @@ async def test_query_validation():
     is_valid, error = validate_query(dangerous_query)
     assert not is_valid
     assert error is not None
+    
+    is_valid, error = validate_query("SELECT * FROM users -- comment")
+    assert not is_valid
+    assert error.endswith(": --")
 
 
 @pytest.mark.asyncio
@@ -68,6 +74,22 @@ async def test_insight_generation():
     # Generate insights
     insights = analyze_query_results(query, results)
     assert len(insights) > 0
+    assert "status completed: order_count 5, total_amount 479.95" in insights
+    assert "Top status: completed with order_count of 5" in insights
+    assert "Bottom status: cancelled with order_count of 1" in insights
+    
+    # Only columns named in the GROUP BY list are grouping columns
+    ordered_insights = analyze_query_results(query + " ORDER BY order_count DESC", results)
+    assert "Top status: completed with order_count of 5" in ordered_insights
+    ordinal_insights = analyze_query_results(query.replace("GROUP BY status", "GROUP BY 1"), results)
+    assert "Top status: completed with order_count of 5" in ordinal_insights
+    
+    # Aggregate query without GROUP BY
+    agg_insights = analyze_query_results(
+        "SELECT AVG(amount) AS avg_amount, MAX(amount) AS max_amount FROM orders",
+        [{"avg_amount": 48.0, "max_amount": 199.99}]
+    )
+    assert agg_insights[1:] == ["avg_amount: 48.0", "max_amount: 199.99"]
     
     # Format insights for memo
     memo_text = format_insights_for_memo(insights, query, "Order Status Analysis")
@@ -78,7 +100,7 @@ async def test_insight_generation():
 @pytest.mark.asyncio
 async def test_result_formatting():
     """Test result formatting."""
-    from src.query_handler import format_query_results
+    from src.query_handler import format_query_results, iter_formatted_rows
     
     # Sample results
     results = [
@@ -93,7 +115,140 @@ async def test_result_formatting():
     assert "email" in formatted
     assert "John Doe" in formatted
     assert "Jane Smith" in formatted
+    
+    # Streaming yields the same lines
+    assert list(iter_formatted_rows(results)) == formatted.split("\n")
+    assert list(iter_formatted_rows([])) == ["No results found."]
+
+
+@pytest.mark.asyncio
+async def test_split_sql_statements():
+    """Test splitting a write script into statements."""
+    from src.query_handler import split_sql_statements
+    
+    script = """
+    DELETE FROM users;
+    INSERT INTO users (name) VALUES ('a;b'), ('c');
+    UPDATE users SET name = 'd'
+    """
+    statements = split_sql_statements(script)
+    assert statements == [
+        "DELETE FROM users",
+        "INSERT INTO users (name) VALUES ('a;b'), ('c')",
+        "UPDATE users SET name = 'd'"
+    ]
+    assert split_sql_statements("  ;  ") == []
+    assert split_sql_statements("DELETE FROM users; -- done") == ["DELETE FROM users"]
+    assert split_sql_statements("/* setup */ ; DELETE FROM users") == ["DELETE FROM users"]
+
+
+@pytest.mark.asyncio
+async def test_bind_query_params():
+    """Test inlining parameters for servers without write_many."""
+    from enum import IntEnum
+    from src.query_handler import bind_query_params, quote_sql_literal
+    
+    query = bind_query_params(
+        "INSERT INTO users (name, note, active) VALUES (?, '?', ?)",
+        ["O'Brien", None]
+    )
+    assert query == "INSERT INTO users (name, note, active) VALUES ('O''Brien', '?', NULL)"
+    
+    with pytest.raises(ValueError):
+        bind_query_params("INSERT INTO users (name) VALUES (?)", ["a", "b"])
+    
+    # Placeholders in comments are not bound
+    query = bind_query_params("INSERT INTO users (id) VALUES (?) /* ? */ -- why?", [1])
+    assert query == "INSERT INTO users (id) VALUES (1) /* ? */ -- why?"
+    
+    # Numeric subclasses render as plain numbers; inf and nan have no literal
+    assert quote_sql_literal(IntEnum("Level", "LOW HIGH").HIGH) == "2"
+    with pytest.raises(ValueError):
+        quote_sql_literal(float("inf"))
+
+
+@pytest.mark.asyncio
+async def test_parse_response():
+    """Test parsing tool results."""
+    from mcp.types import CallToolResult, TextContent
+    
+    client = SQLiteMCPClient()
+    
+    def text_result(text):
+        return CallToolResult(content=[TextContent(type="text", text=text)])
+    
+    assert client.parse_response(text_result('[{"id": 1}]')) == [{"id": 1}]
+    assert client.parse_response(text_result("[{'id': 1, 'note': None}]")) == [{"id": 1, "note": None}]
+    assert client.parse_response(text_result("Table created")) == "Table created"
+    assert client.parse_response('{"affected_rows": 2}') == {"affected_rows": 2}
+
+
+
+@pytest.mark.asyncio
+async def test_generate_queries():
+    """Test generating sample and CREATE TABLE queries."""
+    from src.query_handler import (
+        PreparedQuery, generate_create_table_query, generate_sample_query, prepare_sample_query, validate_query
+    )
+    
+    columns = [{"name": "id", "type": "INTEGER"}, {"name": "name", "type": "TEXT"}]
+    assert generate_sample_query("users", columns) == "SELECT id, name FROM users LIMIT 5;"
+    assert generate_create_table_query("users", columns) == (
+        "CREATE TABLE users (\n  id INTEGER,\n  name TEXT\n);"
+    )
+    
+    prepared = prepare_sample_query("users", columns, limit=10)
+    assert prepared.sql == "SELECT id, name FROM users LIMIT ?;"
+    assert prepared.to_sql() == "SELECT id, name FROM users LIMIT 10;"
+    assert validate_query(prepared) == (True, None)
+    assert not validate_query(PreparedQuery("SELECT * FROM users; DROP TABLE users"))[0]
+    assert hash(PreparedQuery("SELECT * FROM users WHERE id = ?", [1]))
+
+
+def test_anthropic_client_per_event_loop(monkeypatch):
+    """Test that each event loop gets its own Claude client."""
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    client = SQLiteMCPClient()
+    
+    async def get():
+        return client.anthropic, client.anthropic
+    
+    first, same = asyncio.run(get())
+    assert first is same
+    second, _ = asyncio.run(get())
+    assert second is not first
+
+
+@pytest.mark.asyncio
+async def test_call_tool_with_retry_bounded(monkeypatch):
+    """Test that tool calls are retried and limited to MAX_CONCURRENT_TOOL_CALLS at once."""
+    import src.client_sqlite
+    monkeypatch.setattr(src.client_sqlite, "MAX_CONCURRENT_TOOL_CALLS", 2)
+    
+    class FlakySession:
+        def __init__(self):
+            self.active = self.peak = self.calls = 0
+        
+        async def call_tool(self, name, args):
+            self.calls += 1
+            first = self.calls == 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            try:
+                await asyncio.sleep(0.01)
+                if first:
+                    raise ConnectionError("server restarting")
+                return '[{"ok": 1}]'
+            finally:
+                self.active -= 1
+    
+    client = SQLiteMCPClient()
+    client.session = FlakySession()
+    results = await asyncio.gather(*(client.call_tool_with_retry("read_query", {}) for _ in range(5)))
+    assert results == [[{"ok": 1}]] * 5
+    assert client.session.calls == 6
+    assert client.session.peak == 2
 
 
 if __name__ == "__main__":
-    pytest.main(["-xvs", __file__]) 
\ No newline at end of file
+    pytest.main(["-xvs", __file__])
@@ -0,0 +1,243 @@
+"""
+End-to-end tests against a live SQLite MCP server.
+
+All tests share one session-scoped client, so the suite starts the server
+and discovers its tools once. The module is skipped when the server command
+configured by SQLITE_SERVER_PATH is not available.
+"""
+import asyncio
+import os
+import shutil
+import time
+from pathlib import Path
+import sys
+
+import pytest
+import pytest_asyncio
+
+# Add the parent directory to the path so we can import the package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import src.client_sqlite
+from src import SQLiteMCPClient, invalidate_tools_cache
+from src.config import DEFAULT_SERVER_PATH
+from src.session_pool import SESSION_POOL
+
+if not (shutil.which(DEFAULT_SERVER_PATH) or os.path.exists(DEFAULT_SERVER_PATH)):
+    pytest.skip(f"SQLite MCP server not available: {DEFAULT_SERVER_PATH}", allow_module_level=True)
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS mcp_test (
+  id INTEGER PRIMARY KEY,
+  name TEXT NOT NULL,
+  value REAL
+)
+""".strip()
+
+INSERT_ROWS_SQL = """
+INSERT INTO mcp_test (name, value) VALUES
+  ('Test 1', 10.5),
+  ('Test 2', 20.7),
+  ('Test 3', 30.9)
+""".strip()
+
+
+@pytest.fixture(scope="session")
+def db_path(tmp_path_factory):
+    """Path of the database shared by the test session."""
+    return str(tmp_path_factory.mktemp("mcp") / "test.db")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def tools_cache_dir(tmp_path_factory):
+    """Keep the on-disk tools cache out of the developer's ~/.cache."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(src.client_sqlite, "TOOLS_CACHE_DIR", str(tmp_path_factory.mktemp("tools_cache")))
+        yield
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client(db_path):
+    """Yield one connected client for the whole test session."""
+    client = SQLiteMCPClient()
+    await client.connect_to_server(DEFAULT_SERVER_PATH, db_path)
+    yield client
+    await client.cleanup()
+    await SESSION_POOL.aclose()
+
+
+async def test_tools_cache_shared(client, db_path, monkeypatch):
+    """Test that a second client for the same server reuses the session, listed tools and PRAGMAs."""
+    applied = []
+
+    async def apply_pragmas(self, db_path=None):
+        applied.append(db_path)
+
+    monkeypatch.setattr(SQLiteMCPClient, "_apply_pragmas", apply_pragmas)
+    second = SQLiteMCPClient()
+    try:
+        await second.connect_to_server(DEFAULT_SERVER_PATH, db_path)
+        assert second.session is client.session
+        assert second.tools_cache is client.tools_cache
+        assert not applied
+    finally:
+        await second.cleanup()
+
+    invalidate_tools_cache()
+    third = SQLiteMCPClient()
+    try:
+        await third.connect_to_server(DEFAULT_SERVER_PATH, db_path)
+        assert third.tools_cache is not client.tools_cache
+        assert third.tools_cache == client.tools_cache
+    finally:
+        await third.cleanup()
+
+
+async def test_create_table(client):
+    """Test create_table through the session and through the client."""
+    direct_result = await client.session.call_tool("create_table", {"query": CREATE_TABLE_SQL})
+    assert not direct_result.isError
+
+    result = await client.create_table(CREATE_TABLE_SQL)
+    assert "message" in result
+    assert "mcp_test" in await client.list_tables()
+
+
+async def test_write_and_read(client):
+    """Test inserting rows and reading them back."""
+    await client.create_table(CREATE_TABLE_SQL)
+    await client.execute_write_query("DELETE FROM mcp_test")
+    await client.execute_write_query(INSERT_ROWS_SQL)
+
+    rows = await client.execute_read_query("SELECT name, value FROM mcp_test ORDER BY id")
+    assert [row["name"] for row in rows] == ["Test 1", "Test 2", "Test 3"]
+
+
+async def test_schema_cache(client):
+    """Test that schema lookups are cached until a DDL statement runs."""
+    tables = await client.list_tables()
+    schema = await client.describe_table("mcp_test")
+    assert await client.list_tables() is tables
+    assert await client.describe_table("mcp_test") is schema
+
+    await client.execute_write_query("CREATE TABLE IF NOT EXISTS mcp_schema_test (id INTEGER)")
+    assert "mcp_schema_test" in await client.list_tables()
+    assert await client.describe_table("mcp_test") is not schema
+
+
+async def test_schema_cache_shared(client, db_path):
+    """Test that DDL run by one client refreshes the schema cache of the others."""
+    assert "mcp_shared_ddl" not in await client.list_tables()
+    second = SQLiteMCPClient()
+    try:
+        await second.connect_to_server(DEFAULT_SERVER_PATH, db_path)
+        await second.execute_write_query("CREATE TABLE mcp_shared_ddl (id INTEGER)")
+        assert "mcp_shared_ddl" in await client.list_tables()
+    finally:
+        await second.execute_write_query("DROP TABLE IF EXISTS mcp_shared_ddl")
+        await second.cleanup()
+
+
+async def test_append_insight_direct(client):
+    """Test calling append_insight directly on the session."""
+    insight = f"Direct test insight created at {time.time()}"
+    async with asyncio.timeout(10):
+        result = await client.session.call_tool("append_insight", {"insight": insight})
+    assert not result.isError
+
+
+@pytest.mark.parametrize("blocking", [True, False])
+async def test_append_insight(client, blocking):
+    """Test append_insight in blocking and non-blocking mode."""
+    insight = f"Test insight (blocking={blocking}) created at {time.time()}"
+
+    result = await client.append_insight(insight, blocking=blocking)
+    assert "message" in result
+    if not blocking:
+        await result["future"]
+
+    assert insight in await client.get_insights_memo()
+
+
+async def test_append_insight_burst(client):
+    """Test that a burst of non-blocking insights is written in order."""
+    insights = [f"Burst insight {i} created at {time.time()}" for i in range(5)]
+    results = [await client.append_insight(insight, blocking=False) for insight in insights]
+    await asyncio.gather(*(result["future"] for result in results))
+
+    memo = await client.get_insights_memo()
+    positions = [memo.index(insight) for insight in insights]
+    assert positions == sorted(positions)
+
+
+async def test_append_insight_failure(client, monkeypatch):
+    """Test that a failed non-blocking insight fails its future."""
+    async def fail(insight):
+        raise RuntimeError("append failed")
+
+    monkeypatch.setattr(client, "_append_insight_task", fail)
+    result = await client.append_insight("Insight that is never added", blocking=False)
+    with pytest.raises(RuntimeError, match="append failed"):
+        await result["future"]
+
+
+async def test_append_insight_and_fetch(client):
+    """Test appending an insight and fetching the memo in one call."""
+    insight = f"Fetched test insight created at {time.time()}"
+    memo = await client.append_insight_and_fetch(insight)
+    assert insight in memo
+
+
+async def test_snapshot_schema(client):
+    """Test that snapshot_schema matches list_tables and describe_table."""
+    client.refresh_schema()
+    schema = await client.snapshot_schema()
+    assert list(schema) == await client.list_tables()
+    assert schema["mcp_test"] == await client.describe_table("mcp_test")
+
+    client.refresh_schema()
+    assert schema["mcp_test"] == await client.describe_table("mcp_test")
+
+
+async def test_read_query_shortcuts(client):
+    """Test that empty queries skip the server and catalog reads are cached."""
+    assert await client.execute_read_query("  -- nothing to run\n") == []
+
+    query = "SELECT name FROM sqlite_master WHERE type = 'table'"
+    tables = await client.execute_read_query(query)
+    assert await client.execute_read_query(f"  {query}\n") is tables
+
+    await client.execute_write_query("CREATE TABLE IF NOT EXISTS mcp_meta_test (id INTEGER)")
+    assert "mcp_meta_test" in [row["name"] for row in await client.execute_read_query(query)]
+
+    # Data queries that merely mention the catalog are not cached
+    data_query = "SELECT name FROM mcp_test WHERE EXISTS (SELECT 1 FROM sqlite_master)"
+    assert await client.execute_read_query(data_query) is not await client.execute_read_query(data_query)
+
+
+async def test_read_query_stream(client):
+    """Test paging through a query with trailing comments and failing loudly."""
+    query = "SELECT column1 AS n FROM (VALUES (1), (2), (3)) ORDER BY n -- values\n; -- done"
+    assert [row["n"] async for row in client.execute_read_query_stream(query, page_size=2)] == [1, 2, 3]
+
+    with pytest.raises(RuntimeError):
+        async for _ in client.execute_read_query_stream("SELECT * FROM mcp_missing_table"):
+            pass
+
+
+async def test_claude_tools_use_schema_cache(client):
+    """Test that tools run for Claude read and invalidate the schema cache."""
+    tables = await client.list_tables()
+    assert await client._call_claude_tool("list_tables", {}) == [{"name": table} for table in tables]
+
+    await client._call_claude_tool("create_table", {"query": "CREATE TABLE IF NOT EXISTS mcp_claude_test (id INTEGER)"})
+    assert "mcp_claude_test" in await client.list_tables()
+
+
+async def test_claude_tools_read_only(client):
+    """Test that read-only tool calls refuse tools with side effects."""
+    assert await client._call_claude_tool("list_tables", {}, read_only=True)
+    with pytest.raises(PermissionError):
+        await client._call_claude_tool("write_query", {"query": "DELETE FROM mcp_test"}, read_only=True)